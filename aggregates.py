@@ -0,0 +1,249 @@
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import shards
+from connect import with_worksheet
+from scheduler import WRITE
+from schema import NUMERIC_COLUMNS, PUPIL_FIELDS, PUPIL_COLUMNS
+
+
+AGGREGATES_PATH = os.getenv("DL_AGGREGATES_PATH", os.path.join(".cache", "aggregates.db"))
+# Optional worksheet the division-level table is published to
+SUMMARY_WORKSHEET = os.getenv("DL_SUMMARY_WORKSHEET", "Summary")
+
+LEVELS = ("zone", "region", "division")
+KEY_COLUMNS = ("Zone", "Region", "Division")
+SCHOOLS = "Schools"
+TOTAL_ENROLLMENT = "Total Enrollment"
+# Every numeric column plus each school's total pupils (males and females of all classes)
+METRICS = NUMERIC_COLUMNS + (TOTAL_ENROLLMENT,)
+_ENROLLMENT_COLUMNS = tuple(column for column in PUPIL_COLUMNS if not column.endswith(PUPIL_FIELDS[2]))
+
+# One row per (survey year, division, metric). Zeros mean "not filled in" and are
+# left out of count/sum/min/max, as in the analytics page; the "Schools" metric
+# counts every school.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS aggregates (
+    year INTEGER NOT NULL,
+    zone TEXT NOT NULL,
+    region TEXT NOT NULL,
+    division TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    sum REAL NOT NULL,
+    min REAL,
+    max REAL,
+    PRIMARY KEY (year, zone, region, division, metric)
+)
+"""
+
+_UPSERT = (
+    "INSERT INTO aggregates (year, zone, region, division, metric, count, sum, min, max) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (year, zone, region, division, metric) DO UPDATE SET "
+    "count = count + excluded.count, sum = sum + excluded.sum, "
+    "min = MIN(COALESCE(min, excluded.min), COALESCE(excluded.min, min)), "
+    "max = MAX(COALESCE(max, excluded.max), COALESCE(excluded.max, max))"
+)
+
+
+def _connect():
+    directory = os.path.dirname(AGGREGATES_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(AGGREGATES_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(_SCHEMA)
+    return conn
+
+
+def _number(value):
+    """A cell as a float, or 0 for blanks and text"""
+    try:
+        return float(str(value).replace(",", "")) if value not in (None, "") else 0.0
+    except ValueError:
+        return 0.0
+
+
+def _merge(totals, key, value):
+    stats = totals.get(key)
+    if stats is None:
+        totals[key] = [1, value, value, value]
+    else:
+        stats[0] += 1
+        stats[1] += value
+        stats[2] = min(stats[2], value)
+        stats[3] = max(stats[3], value)
+
+
+def _row_year(timestamp, worksheet_name):
+    """Survey year a stored row belongs to: its shard's, or its timestamp's on the legacy sheet"""
+    return shards.shard_year(worksheet_name) or shards.timestamp_year(timestamp)
+
+
+def add_rows(headers, rows, worksheet_name=None):
+    """Fold rows just appended to a worksheet into the aggregates.
+
+    Constant work per row (one pass over METRICS), then one upsert per touched
+    (division, metric) for the whole batch. Called after each successful append
+    by the outbox (form and API submissions) and by the bulk importer. Rows
+    whose year cannot be told are left out.
+    """
+    position = {column: n for n, column in enumerate(headers)}
+    if not all(column in position for column in KEY_COLUMNS):
+        return
+    totals = {}
+    schools = {}
+    for row in rows:
+        year = _row_year(row[position["Timestamp"]] if "Timestamp" in position else None, worksheet_name)
+        if year is None:
+            continue
+        group = (year,) + tuple(str(row[position[column]]) for column in KEY_COLUMNS)
+        schools[group] = schools.get(group, 0) + 1
+        values = {column: _number(row[position[column]]) for column in NUMERIC_COLUMNS if column in position}
+        values[TOTAL_ENROLLMENT] = sum(values.get(column, 0.0) for column in _ENROLLMENT_COLUMNS)
+        for metric, value in values.items():
+            if value > 0:
+                _merge(totals, group + (metric,), value)
+
+    conn = _connect()
+    try:
+        with conn:
+            conn.executemany(_UPSERT, [group + (SCHOOLS, count, count, None, None)
+                                       for group, count in schools.items()])
+            conn.executemany(_UPSERT, [key + tuple(stats) for key, stats in totals.items()])
+    finally:
+        conn.close()
+
+
+def rebuild(sync=True):
+    """Recompute every aggregate from the sheet, replacing what is stored.
+
+    This is the reconciliation path (rows edited or deleted in Sheets, appends
+    made by other tools), so every shard is synced with Sheets first even if
+    another process refreshed it moments ago. Returns the number of schools
+    counted; rows whose year cannot be told are left out, as in add_rows.
+    """
+    import pandas as pd
+    frames = []
+    for snapshot in shards.federated_snapshots(sync, force=sync):
+        frame = snapshot.frame() if snapshot.version else pd.DataFrame()
+        if frame.empty or not all(column in frame for column in KEY_COLUMNS):
+            continue
+        stamps = frame["Timestamp"] if "Timestamp" in frame else pd.Series([""] * len(frame), index=frame.index)
+        frame["year"] = [_row_year(stamp, snapshot.worksheet_name) for stamp in stamps]
+        frames.append(frame[frame["year"].notna()])
+    frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=("year",) + KEY_COLUMNS)
+
+    keys = frame[["year"]].astype(int).join(frame[list(KEY_COLUMNS)].astype(str))
+    values = pd.DataFrame({column: pd.to_numeric(frame[column], errors="coerce").fillna(0.0)
+                           if column in frame else 0.0 for column in NUMERIC_COLUMNS}, index=frame.index)
+    values[TOTAL_ENROLLMENT] = values[list(_ENROLLMENT_COLUMNS)].sum(axis=1)
+
+    long = pd.concat([keys, values], axis=1).melt(id_vars=list(keys.columns), var_name="metric")
+    long = long[long["value"] > 0]
+    stats = long.groupby(list(keys.columns) + ["metric"])["value"].agg(["count", "sum", "min", "max"])
+    counts = keys.groupby(list(keys.columns)).size()
+
+    rows = [(int(year), zone, region, division, SCHOOLS, int(count), float(count), None, None)
+            for (year, zone, region, division), count in counts.items()]
+    rows += [(int(year), zone, region, division, metric, int(count), float(total), float(low), float(high))
+             for (year, zone, region, division, metric), (count, total, low, high)
+             in zip(stats.index, stats.itertuples(index=False))]
+
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute("DELETE FROM aggregates")
+            conn.executemany(_UPSERT, rows)
+    finally:
+        conn.close()
+    return len(frame)
+
+
+def summary(by="zone", metrics=None, year=None, **filters):
+    """Count/sum/min/max/mean per zone, region or division, e.g.
+
+        summary("region", [TOTAL_ENROLLMENT], region="Accra")
+        summary("zone", ["Lowest Teacher Salary"])
+
+    Reads the stored division rows only, so the cost grows with the number of
+    divisions, not schools. `year` defaults to the current survey year; filters
+    are zone=, region= or division=. Returns a DataFrame.
+    """
+    import pandas as pd
+    if by not in LEVELS:
+        raise ValueError(f"by must be one of {', '.join(LEVELS)}")
+    unknown = set(filters) - set(LEVELS)
+    if unknown:
+        raise ValueError(f"Unknown filters: {', '.join(sorted(unknown))}")
+    group = LEVELS[:LEVELS.index(by) + 1]
+    where = ["year = ?"] + [f"{level} = ?" for level in filters]
+    params = [year or shards.survey_year()] + list(filters.values())
+    if metrics:
+        where.append(f"metric IN ({', '.join('?' * len(metrics))})")
+        params += list(metrics)
+
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            f"SELECT {', '.join(group)}, metric, SUM(count), SUM(sum), MIN(min), MAX(max) FROM aggregates "
+            f"WHERE {' AND '.join(where)} GROUP BY {', '.join(group)}, metric ORDER BY {', '.join(group)}, metric",
+            params
+        ).fetchall()
+    finally:
+        conn.close()
+    frame = pd.DataFrame(rows, columns=[level.capitalize() for level in group] + ["Metric", "Count", "Sum", "Min", "Max"])
+    frame["Mean"] = (frame["Sum"] / frame["Count"]).where(frame["Metric"] != SCHOOLS)
+    return frame
+
+
+def publish(year=None, worksheet_name=SUMMARY_WORKSHEET):
+    """Write the division-level aggregates to a worksheet, one row per division"""
+    frame = summary("division", year=year)
+    table = frame.pivot_table(index=["Zone", "Region", "Division"], columns="Metric",
+                              values=["Count", "Sum", "Min", "Max"], aggfunc="first")
+    columns = [("Count", SCHOOLS)] + [(stat, metric) for metric in METRICS for stat in ("Count", "Sum", "Min", "Max")]
+    table = table.reindex(columns=columns)
+    headers = ["Zone", "Region", "Division", SCHOOLS] + [f"{metric} {stat}" for stat, metric in columns[1:]]
+    # Blank where a division has no filled-in value; whole numbers without the ".0"
+    rows = [list(index) + ["" if value != value else int(value) if value == int(value) else value
+                           for value in values]
+            for index, values in zip(table.index, table.to_numpy(dtype=float).tolist())]
+
+    def write(worksheet):
+        worksheet.clear()
+        worksheet.resize(rows=len(rows) + 1, cols=len(headers))
+        worksheet.update([headers] + rows, "A1")
+    with_worksheet(write, worksheet_name, kind=WRITE, create=True)
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summary aggregates per zone, region and division")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute everything from the sheet first")
+    parser.add_argument("--no-sync", action="store_true",
+                        help="Rebuild from the local snapshots as they are instead of syncing with Sheets")
+    parser.add_argument("--publish", action="store_true", help=f"Write the table to the '{SUMMARY_WORKSHEET}' worksheet")
+    parser.add_argument("--by", choices=LEVELS, default="zone", help="Level to summarise at")
+    parser.add_argument("--metric", action="append", help="Only these metrics (repeatable)")
+    parser.add_argument("--year", type=int, help="Survey year (default: the current one)")
+    for level in LEVELS:
+        parser.add_argument(f"--{level}", help=f"Only this {level}")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        start = time.perf_counter()
+        count = rebuild(sync=not args.no_sync)
+        print(f"Rebuilt aggregates from {count} schools in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    if args.publish:
+        count = publish(args.year)
+        print(f"Published {count} divisions to '{SUMMARY_WORKSHEET}'", file=sys.stderr)
+    filters = {level: getattr(args, level) for level in LEVELS if getattr(args, level)}
+    print(summary(args.by, args.metric, args.year, **filters).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
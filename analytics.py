@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+import health
+import metrics
+import shards
+from schema import CLASS_LEVELS, FINANCIAL_COLUMNS, PUPIL_COLUMNS, PUPIL_FIELDS, STAFF_COLUMNS
+from zones import load_zone_index
+
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+class Dataset:
+    """Per-school arrays reshaped once per snapshot version.
+
+    Pupil columns become (schools x levels) matrices; location columns become
+    integer codes so filters and group-bys are plain NumPy operations.
+    """
+
+    def __init__(self, frame):
+        self.size = len(frame)
+        self.codes = {}
+        self.labels = {}
+        for column in ("Zone", "Region", "Division"):
+            values = frame[column] if column in frame else pd.Series([""] * self.size)
+            codes, labels = pd.factorize(values.astype(str))
+            self.codes[column] = codes
+            self.labels[column] = labels
+
+        def numeric(columns):
+            present = [frame[c].to_numpy(dtype=np.float64) if c in frame else np.full(self.size, np.nan)
+                       for c in columns]
+            return np.nan_to_num(np.column_stack(present), nan=0.0) if present else np.zeros((self.size, 0))
+
+        pupils = numeric(PUPIL_COLUMNS).reshape(self.size, len(CLASS_LEVELS), len(PUPIL_FIELDS))
+        self.males = pupils[:, :, 0]
+        self.females = pupils[:, :, 1]
+        self.tuition = pupils[:, :, 2]
+        self.financial = numeric(FINANCIAL_COLUMNS)
+        self.staff = numeric(STAFF_COLUMNS)
+
+    def mask(self, zone=None, region=None, division=None):
+        mask = np.ones(self.size, dtype=bool)
+        for column, value in (("Zone", zone), ("Region", region), ("Division", division)):
+            if value:
+                matches = np.flatnonzero(self.labels[column] == value)
+                mask &= self.codes[column] == (matches[0] if len(matches) else -2)
+        return mask
+
+
+@st.cache_resource(max_entries=2)
+def load_dataset(versions):
+    """Build the Dataset for a set of ((worksheet, version), ...) shard snapshots, the cache key"""
+    snapshots = {snapshot.worksheet_name: snapshot for snapshot in shards.federated_snapshots(sync=False)}
+    frames = [snapshots[name].frame() for name, _ in versions if name in snapshots]
+    return Dataset(pd.concat(frames, ignore_index=True) if frames else pd.DataFrame())
+
+
+def _percentiles(values):
+    """Percentile table for each column of a 2-D array, ignoring zeros (not filled in)"""
+    values = np.where(values > 0, values, np.nan)
+    if not len(values):
+        return np.full((len(PERCENTILES), values.shape[1]), np.nan)
+    return np.nanpercentile(values, PERCENTILES, axis=0)
+
+
+def summarize(data, mask, group_by):
+    """All aggregates for the selected schools, computed with vectorized NumPy"""
+    males = data.males[mask]
+    females = data.females[mask]
+    tuition = data.tuition[mask]
+    enrollment = males + females
+    teaching_staff = data.staff[mask, 0]
+
+    codes = data.codes[group_by][mask]
+    labels = data.labels[group_by]
+    per_school = enrollment.sum(axis=1)
+    by_group = pd.DataFrame({
+        "Schools": np.bincount(codes, minlength=len(labels)),
+        "Males": np.bincount(codes, weights=males.sum(axis=1), minlength=len(labels)),
+        "Females": np.bincount(codes, weights=females.sum(axis=1), minlength=len(labels)),
+        "Teaching Staff": np.bincount(codes, weights=teaching_staff, minlength=len(labels)),
+        "Est. Tuition Revenue": np.bincount(codes, weights=(enrollment * tuition).sum(axis=1), minlength=len(labels)),
+    }, index=pd.Index(labels, name=group_by))
+    by_group = by_group[by_group["Schools"] > 0]
+    by_group["Pupils"] = by_group["Males"] + by_group["Females"]
+    by_group["Pupil-Teacher Ratio"] = by_group["Pupils"] / by_group["Teaching Staff"].replace(0, np.nan)
+
+    by_level = pd.DataFrame({
+        "Males": males.sum(axis=0),
+        "Females": females.sum(axis=0),
+    }, index=pd.Index(CLASS_LEVELS, name="Class Level"))
+    by_level["Females per 100 Males"] = 100 * by_level["Females"] / by_level["Males"].replace(0, np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios = np.where(teaching_staff > 0, per_school / teaching_staff, np.nan)
+    ratios = ratios[~np.isnan(ratios)]
+    counts, edges = np.histogram(ratios, bins=20) if len(ratios) else (np.array([]), np.array([0.0]))
+    ratio_histogram = pd.DataFrame(
+        {"Schools": counts}, index=pd.Index([f"{edge:.0f}" for edge in edges[:-1]], name="Pupils per Teacher")
+    )
+
+    columns = [f"P{p}" for p in PERCENTILES]
+    tuition_table = pd.DataFrame(_percentiles(tuition).T, index=pd.Index(CLASS_LEVELS, name="Tuition (GHS)"),
+                                 columns=columns)
+    financial_table = pd.DataFrame(_percentiles(data.financial[mask]).T,
+                                   index=pd.Index(FINANCIAL_COLUMNS, name="GHS"), columns=columns)
+
+    totals = {
+        "schools": int(mask.sum()),
+        "pupils": float(enrollment.sum()),
+        "females_per_100_males": 100 * females.sum() / males.sum() if males.sum() else float("nan"),
+        "pupil_teacher_ratio": enrollment.sum() / teaching_staff.sum() if teaching_staff.sum() else float("nan"),
+        "tuition_revenue": float((enrollment * tuition).sum()),
+    }
+    return totals, by_group, by_level, ratio_histogram, tuition_table, financial_table
+
+
+def render():
+    """Analytics page: enrollment and finance aggregates from the local snapshot"""
+    st.subheader("Deeper Life Basic Schools - Analytics")
+
+    if health.status() == health.DOWN:
+        st.warning("⚠️ Network connection issue detected; showing the last synced data")
+    # Never sync on the script thread: the refresher thread keeps the snapshots current
+    versions = tuple(
+        (snapshot.worksheet_name, snapshot.version)
+        for snapshot in shards.federated_snapshots(sync=False)
+        if snapshot.version
+    )
+    if not versions:
+        st.info("No submissions have been synced yet.")
+        return
+
+    with metrics.span("analytics.load"):
+        data = load_dataset(versions)
+
+    zones = load_zone_index()
+    col1, col2, col3 = st.columns(3)
+    zone = col1.selectbox("Zone", options=zones.zones, index=None, placeholder="All zones")
+    region = col2.selectbox("Region", options=zones.regions(zone), index=None, placeholder="All regions")
+    division = col3.selectbox("Division", options=zones.divisions(zone, region), index=None,
+                              placeholder="All divisions")
+    group_by = "Division" if region else "Region" if zone else "Zone"
+
+    with metrics.span("analytics.summarize"):
+        totals, by_group, by_level, ratio_histogram, tuition_table, financial_table = summarize(
+            data, data.mask(zone, region, division), group_by
+        )
+
+    k1, k2, k3, k4 = st.columns(4)
+    k1.metric("Schools", f"{totals['schools']:,}")
+    k2.metric("Pupils", f"{totals['pupils']:,.0f}")
+    k3.metric("Girls per 100 Boys", f"{totals['females_per_100_males']:.0f}")
+    k4.metric("Pupils per Teacher", f"{totals['pupil_teacher_ratio']:.1f}")
+    st.metric("Estimated Tuition Revenue (GHS, enrollment × tuition)", f"{totals['tuition_revenue']:,.0f}")
+
+    st.write(f"**Enrollment by {group_by}**")
+    st.bar_chart(by_group[["Males", "Females"]], stack=True)
+    st.dataframe(by_group)
+
+    st.write("**Enrollment by Class Level**")
+    st.bar_chart(by_level[["Males", "Females"]], stack=True)
+    st.dataframe(by_level)
+
+    st.write("**Pupil-Teacher Ratio Distribution**")
+    st.bar_chart(ratio_histogram)
+
+    st.write("**Tuition Distribution by Class Level**")
+    st.dataframe(tuition_table.round(0))
+    st.write("**Fee and Salary Distribution**")
+    st.dataframe(financial_table.round(0))
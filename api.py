@@ -0,0 +1,222 @@
+import os
+import hmac
+import math
+import json
+import sqlite3
+import time
+import argparse
+import datetime
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import health
+import metrics
+import outbox
+import warmup
+from schema import (
+    BASIC_COLUMNS, COLUMN_INDEX, HEADERS, NUMERIC_COLUMNS, TIMESTAMP_FORMAT, clean_phone, format_name, validate
+)
+from submissions import submit_records
+from zones import load_zone_index
+
+
+# Largest request body accepted (bytes) and records per request
+MAX_BODY = int(os.getenv("DL_API_MAX_BODY", str(2 * 1024 * 1024)))
+MAX_BATCH = int(os.getenv("DL_API_MAX_BATCH", "500"))
+# Refuse new records while this many rows are still waiting for the sheet
+MAX_PENDING = int(os.getenv("DL_API_MAX_PENDING", "5000"))
+# Seconds clients are told to wait when the queue is full
+RETRY_AFTER = 30
+# Seconds an outbox depth reading is reused, so the check costs no I/O per request
+PENDING_TTL = 1.0
+# Shared secret for the Authorization: Bearer header; unset disables the check
+API_TOKEN = os.getenv("DL_API_TOKEN")
+
+_pending = {"count": 0, "at": 0.0}
+_pending_lock = threading.Lock()
+
+
+def queue_depth():
+    """Rows waiting in the outbox, refreshed at most every PENDING_TTL seconds"""
+    with _pending_lock:
+        if time.monotonic() - _pending["at"] > PENDING_TTL:
+            _pending["count"] = outbox.pending_count()
+            _pending["at"] = time.monotonic()
+        return _pending["count"]
+
+
+def _whole_number(value):
+    """Parse 12, 12.0 or "12" as an int; anything else (negative, fractional, nan/inf, text) is None"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        try:
+            value = float(value.strip())
+        except ValueError:
+            return None
+    if not isinstance(value, (int, float)) or not math.isfinite(value) or value < 0 or value != int(value):
+        return None
+    return int(value)
+
+
+def normalize_record(raw):
+    """Turn a JSON object in flatten_data shape into a row laid out as HEADERS.
+
+    Returns (row, errors); the row is None if the object is unusable.
+    """
+    if not isinstance(raw, dict):
+        return None, ["Each record must be a JSON object"]
+    missing = [column for column in BASIC_COLUMNS + NUMERIC_COLUMNS if column not in raw]
+    unknown = [column for column in raw if column not in COLUMN_INDEX]
+    errors = []
+    if missing:
+        errors.append(f"Missing fields: {', '.join(missing)}")
+    if unknown:
+        errors.append(f"Unknown fields: {', '.join(unknown)}")
+    timestamp = str(raw.get("Timestamp") or "").strip()
+    if timestamp:
+        # Stored as sent (the shard is always the current survey year's), in the form's own format
+        try:
+            datetime.datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+        except ValueError:
+            errors.append("Timestamp must be in YYYY-MM-DD HH:MM:SS format")
+    if errors:
+        return None, errors
+
+    row = [timestamp or datetime.datetime.now().strftime(TIMESTAMP_FORMAT)]
+    row += [str(raw[column] if raw[column] is not None else "").strip() for column in BASIC_COLUMNS]
+    row += [_whole_number(raw[column]) for column in NUMERIC_COLUMNS]
+    for column in ("School Name", "Head Teacher"):
+        row[COLUMN_INDEX[column]] = format_name(row[COLUMN_INDEX[column]])
+    for column in ("Phone", "WhatsApp"):
+        row[COLUMN_INDEX[column]] = clean_phone(row[COLUMN_INDEX[column]])
+    return row, []
+
+
+def ingest(records):
+    """Validate, duplicate-check and queue records; returns one result dict per record"""
+    zone_index = load_zone_index()
+    results = [None] * len(records)
+    valid = []
+    for n, raw in enumerate(records):
+        row, errors = normalize_record(raw)
+        if row is not None:
+            errors = validate(row, zone_index)
+        if errors:
+            results[n] = {"index": n, "status": "rejected", "errors": errors}
+        else:
+            # Only accepted rows become dicts, for the duplicate keys and the outbox
+            valid.append((n, dict(zip(HEADERS, row))))
+
+    for (n, record), (ok, message) in zip(valid, submit_records([record for _, record in valid])):
+        results[n] = ({"index": n, "status": "accepted"} if ok
+                      else {"index": n, "status": "duplicate", "errors": [message]})
+    return results
+
+
+class IngestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "DLSchoolsIngest/1.0"
+    # Headers and body go out in separate writes; without this each keep-alive
+    # response waits ~40 ms on Nagle plus the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        metrics.incr("api_responses", status=status)
+
+    def _error(self, status, message, headers=None):
+        # The request body may be unread, so the connection cannot be reused
+        self.close_connection = True
+        self._reply(status, {"error": message}, headers)
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/health":
+            return self._error(404, "Not found")
+        self._reply(200, {"sheets": health.status(), "pending": queue_depth(), "max_pending": MAX_PENDING})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/records":
+            return self._error(404, "Not found")
+        if API_TOKEN and not hmac.compare_digest(
+                self.headers.get("Authorization", ""), f"Bearer {API_TOKEN}"):
+            return self._error(401, "Missing or invalid API token")
+
+        length = self.headers.get("Content-Length", "")
+        if not length.isdigit():
+            return self._error(411, "Content-Length required")
+        if int(length) > MAX_BODY:
+            return self._error(413, f"Request body is larger than {MAX_BODY} bytes")
+        try:
+            payload = json.loads(self.rfile.read(int(length)))
+        except ValueError:
+            return self._error(400, "Request body is not valid JSON")
+
+        # A single record, a list of records, or {"records": [...]}
+        if isinstance(payload, dict) and isinstance(payload.get("records"), list):
+            records = payload["records"]
+        elif isinstance(payload, list):
+            records = payload
+        else:
+            records = [payload]
+        if not records:
+            return self._error(400, "No records in request")
+        if len(records) > MAX_BATCH:
+            return self._error(413, f"At most {MAX_BATCH} records per request")
+
+        # Backpressure: the outbox absorbs Sheets outages, but only up to a point
+        if queue_depth() + len(records) > MAX_PENDING:
+            return self._error(503, "Submission queue is full, retry later",
+                               {"Retry-After": str(RETRY_AFTER)})
+
+        try:
+            with metrics.span("api.records", records=len(records)):
+                results = ingest(records)
+        except sqlite3.Error:
+            # The outbox could not take the rows (disk full, database locked too long)
+            return self._error(503, "Submission queue is unavailable, retry later",
+                               {"Retry-After": str(RETRY_AFTER)})
+        except Exception:
+            return self._error(500, "Internal error while processing the records")
+        accepted = sum(1 for result in results if result["status"] == "accepted")
+        self._reply(202 if accepted else 422, {
+            "accepted": accepted,
+            "rejected": len(results) - accepted,
+            "results": results,
+        })
+
+
+def serve(host="127.0.0.1", port=8600):
+    """Run the ingestion service until interrupted"""
+    # Duplicate index, outbox worker and health monitor, as for the Streamlit app
+    warmup.start()
+    server = ThreadingHTTPServer((host, port), IngestHandler)
+    server.daemon_threads = True
+    print(f"Listening on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP JSON endpoint for pushing school records")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8600, help="Port to listen on")
+    args = parser.parse_args()
+    serve(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
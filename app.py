@@ -1,6 +1,10 @@
 import streamlit as st
 from data import DeeperLifeSurvey
+import warmup
+import metrics
 
+# Prime shared caches in the background as soon as the server process starts
+warmup.start()
 
 
 # Set page configuration
@@ -10,8 +14,13 @@ with st.container(border=True):
 # Header and section selector
     st.image('./media/Final.png')
     
-    survey = DeeperLifeSurvey()
-    survey.run()
+    with metrics.span("rerun"):
+        if st.query_params.get("view") == "analytics":
+            import analytics
+            analytics.render()
+        else:
+            survey = DeeperLifeSurvey()
+            survey.run()
   
        
 
@@ -0,0 +1,191 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import tempfile
+import statistics
+import streamlit as st
+import fake_sheets
+import duplicates
+import jobs
+import snapshot
+import outbox
+import sharedcache
+from data import DeeperLifeSurvey
+from schema import BASIC_COLUMNS, FINANCIAL_COLUMNS, PUPIL_COLUMNS, STAFF_COLUMNS
+from zones import load_zone_index
+
+
+def _measure(fn, repeat, setup=None):
+    """Run fn `repeat` times and return per-call timings in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _summary(name, rows, timings):
+    ordered = sorted(timings)
+    return {
+        "name": name,
+        "rows": rows,
+        "runs": len(timings),
+        "mean_ms": statistics.fmean(timings),
+        "min_ms": ordered[0],
+        "p50_ms": ordered[len(ordered) // 2],
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+    }
+
+
+def _fill_session(zone_triples):
+    """Populate session state with a valid, non-duplicate submission"""
+    zone, region, division = zone_triples[0]
+    DeeperLifeSurvey()
+    record = st.session_state.record
+    for column, value in zip(BASIC_COLUMNS, (zone, region, division, "bench school", "bench teacher",
+                                             "0209999999", "0509999999")):
+        record[column] = value
+    for column in PUPIL_COLUMNS:
+        record[column] = 150 if column.endswith("Tuition") else 10
+    for column in FINANCIAL_COLUMNS:
+        record[column] = 100
+    for column in STAFF_COLUMNS:
+        record[column] = 5
+
+
+def bench_size(rows, latency, repeat):
+    zone_index = load_zone_index()
+    triples = sorted(zone_index.triples)
+    survey = DeeperLifeSurvey()
+    _fill_session(triples)
+    headers = list(survey.flatten_data().keys())
+    worksheet = fake_sheets.install(fake_sheets.make_rows(headers, rows, triples), latency)
+    results = []
+
+    def cold_start():
+        duplicates._indexes.clear()
+        snapshot._snapshots.clear()
+        snapshot.SNAPSHOT_DIR = tempfile.mkdtemp()
+
+    # Cold: the first check pays for the full snapshot read and index build
+    results.append(_summary("check_duplicate_entry.cold", rows, _measure(
+        survey.check_duplicate_entry, max(1, repeat // 10), setup=cold_start)))
+    # Warm: set lookup plus an (empty) delta read
+    index = duplicates.get_index()
+    results.append(_summary("check_duplicate_entry.warm", rows, _measure(
+        survey.check_duplicate_entry, repeat, setup=lambda: setattr(index.snapshot, "_last_sync", None))))
+    results.append(_summary("check_duplicate_entry.cached", rows, _measure(
+        survey.check_duplicate_entry, repeat)))
+
+    results.append(_summary("flatten_data", rows, _measure(survey.flatten_data, repeat)))
+
+    def submit():
+        # A new school each time so the idempotency key never collapses it
+        st.session_state.record["School Name"] = f"bench school {time.perf_counter_ns()}"
+        previous = st.session_state.submission_job
+        survey.submit_data()
+        job = jobs.get(st.session_state.submission_job)
+        if job is None or st.session_state.submission_job == previous:
+            raise RuntimeError("submit_data did not start a submission")
+        # Until the job finishes the next submit_data would return early; time the whole submission
+        job.future.result()
+    results.append(_summary("submit_data", rows, _measure(submit, repeat)))
+    results.append(_summary("outbox.flush", rows, _measure(outbox.flush, 1)))
+
+    def cascade():
+        for zone in zone_index.zones:
+            for region in zone_index.regions(zone):
+                zone_index.divisions(zone, region)
+    results.append(_summary("school_info_section.cascade", rows, _measure(cascade, repeat)))
+
+    results.append(_summary("apptest.rerun", rows, _bench_apptest(repeat, triples)))
+    print(f"{rows} rows: {sum(worksheet.calls.values())} fake Sheets calls", file=sys.stderr)
+    return results
+
+
+def _bench_apptest(repeat, triples):
+    """Time full-page reruns of app.py, including cascading selectbox changes"""
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return []
+    at = AppTest.from_file("app.py", default_timeout=60)
+    at.run()
+    timings = []
+    for n in range(repeat):
+        zone, region, _ = triples[n % len(triples)]
+        start = time.perf_counter()
+        at.selectbox(key="zone_select").select(zone).run()
+        at.selectbox(key="region_select").select(region).run()
+        timings.append((time.perf_counter() - start) * 1000 / 2)
+    return timings
+
+
+def compare(results, baseline_path, threshold):
+    """Return the benchmarks whose mean regressed by more than `threshold` x the baseline"""
+    with open(baseline_path) as f:
+        baseline = {(r["name"], r["rows"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        previous = baseline.get((result["name"], result["rows"]))
+        if previous and result["mean_ms"] > previous["mean_ms"] * threshold:
+            regressions.append((result, previous))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks against an in-memory Sheets backend")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Worksheet row counts to benchmark")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per Sheets call")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per benchmark")
+    parser.add_argument("--output", default="bench_results.json", help="JSON file for the results")
+    parser.add_argument("--compare", help="Baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Allowed slowdown factor against the baseline")
+    args = parser.parse_args()
+
+    # Bare-mode streamlit warns on every session_state access
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+    outbox.OUTBOX_PATH = os.path.join(tempfile.mkdtemp(), "outbox.db")
+    sharedcache.SHARED_CACHE_PATH = os.path.join(tempfile.mkdtemp(), "shared.db")
+
+    results = []
+    for size in args.sizes:
+        results.extend(bench_size(size, args.latency, args.repeat))
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "latency_s": args.latency,
+            "repeat": args.repeat,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for result in results:
+        print(f"{result['name']:32} {result['rows']:>7} rows  "
+              f"mean {result['mean_ms']:9.3f} ms  p95 {result['p95_ms']:9.3f} ms")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        for result, previous in regressions:
+            print(f"REGRESSION {result['name']} ({result['rows']} rows): "
+                  f"{previous['mean_ms']:.3f} -> {result['mean_ms']:.3f} ms", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
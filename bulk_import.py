@@ -0,0 +1,214 @@
+import os
+import sys
+import time
+import argparse
+import datetime
+import numpy as np
+import pandas as pd
+import aggregates
+from connect import with_worksheet
+import shards
+from duplicates import make_key
+from outbox import ensure_headers
+from scheduler import WRITE
+import schema
+from schema import (
+    BASIC_COLUMNS, CLASS_LEVELS, FINANCIAL_COLUMNS, HEADERS, NUMERIC_COLUMNS,
+    PUPIL_COLUMNS, PUPIL_FIELDS, STAFF_COLUMNS, STAFF_LIMITS
+)
+from zones import load_zone_index
+
+
+# Rows per append_rows call
+CHUNK_SIZE = 500
+# Seconds between append_rows calls, keeping well under the per-minute write quota
+CHUNK_PAUSE = 1.0
+MAX_RETRIES = 5
+
+
+def read_table(path, sheet=None):
+    """Read a CSV or Excel file with every cell as a string"""
+    if path.lower().endswith((".xlsx", ".xlsm")):
+        frame = pd.read_excel(path, sheet_name=sheet or 0, dtype=str, keep_default_na=False)
+    else:
+        frame = pd.read_csv(path, dtype=str, keep_default_na=False)
+    frame.columns = [str(column).strip() for column in frame.columns]
+    return frame
+
+
+def format_names(series):
+    """Column-wise schema.format_name"""
+    return series.map(schema.format_name)
+
+
+def clean_phones(series):
+    """Column-wise schema.clean_phone"""
+    return series.map(schema.clean_phone)
+
+
+def validate(frame, zone_index):
+    """Apply the rules of schema.validate to every row at once, with its messages.
+
+    Returns the parsed numeric columns and a Series of error messages ('' for valid rows).
+    """
+    numbers = frame[list(NUMERIC_COLUMNS)].apply(pd.to_numeric, errors="coerce")
+    values = numbers.to_numpy(dtype=float)
+    pupils = numbers[list(PUPIL_COLUMNS)].to_numpy(dtype=float).reshape(-1, len(CLASS_LEVELS), len(PUPIL_FIELDS))
+    financial = numbers[list(FINANCIAL_COLUMNS)].to_numpy(dtype=float)
+    staff = numbers[list(STAFF_COLUMNS)].to_numpy(dtype=float)
+
+    checks = {
+        schema.REQUIRED_BASIC:
+            (frame[list(BASIC_COLUMNS)] != "").all(axis=1).to_numpy(),
+        schema.INVALID_PHONE:
+            frame["Phone"].str.fullmatch(r"\d{10}").to_numpy(),
+        schema.INVALID_WHATSAPP:
+            frame["WhatsApp"].str.fullmatch(r"\d{10}").to_numpy(),
+        schema.UNKNOWN_ZONE:
+            pd.MultiIndex.from_frame(frame[["Zone", "Region", "Division"]]).isin(list(zone_index.triples)),
+        schema.NOT_WHOLE_NUMBERS:
+            ((values >= 0) & (values == np.floor(values))).all(axis=1),
+        schema.PUPILS_REQUIRED:
+            ~(pupils == 0).all(axis=2).any(axis=1),
+        schema.FINANCIAL_REQUIRED:
+            (financial != 0).all(axis=1),
+        schema.STAFF_REQUIRED:
+            (staff != 0).all(axis=1),
+        schema.STAFF_LIMIT_EXCEEDED:
+            (staff <= np.array(list(STAFF_LIMITS.values()))).all(axis=1),
+    }
+
+    errors = pd.Series("", index=frame.index)
+    for message, ok in checks.items():
+        errors = errors.where(np.asarray(ok, dtype=bool), errors + message + "; ")
+    return numbers, errors
+
+
+def prepare(frame, zone_index):
+    """Normalize, validate and dedupe an input table.
+
+    Returns ({shard worksheet: rows in HEADERS order}, rejected rows with an Errors column).
+    """
+    missing = [column for column in BASIC_COLUMNS + NUMERIC_COLUMNS if column not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    frame = frame.copy()
+    for column in BASIC_COLUMNS:
+        frame[column] = frame[column].astype(str).str.strip()
+    frame["School Name"] = format_names(frame["School Name"])
+    frame["Head Teacher"] = format_names(frame["Head Teacher"])
+    frame["Phone"] = clean_phones(frame["Phone"])
+    frame["WhatsApp"] = clean_phones(frame["WhatsApp"])
+
+    numbers, errors = validate(frame, zone_index)
+
+    timestamp = datetime.datetime.now().strftime(schema.TIMESTAMP_FORMAT)
+    if "Timestamp" in frame.columns:
+        frame["Timestamp"] = frame["Timestamp"].str.strip().where(frame["Timestamp"].str.strip() != "", timestamp)
+    else:
+        frame["Timestamp"] = timestamp
+    valid_stamp = np.array([shards.timestamp_year(stamp) is not None for stamp in frame["Timestamp"]], dtype=bool)
+    errors = errors.where(valid_stamp, errors + "Timestamp is not a valid date; ")
+    frame["Shard"] = [shards.shard_name(zone, shards.survey_year(stamp)) if valid else ""
+                      for zone, stamp, valid in zip(frame["Zone"], frame["Timestamp"], valid_stamp)]
+
+    # One snapshot read per shard the file touches (plus the legacy sheet), then set lookups.
+    # Rows with an unknown zone or a bad timestamp are already rejected and must not create a shard.
+    known_zone = frame["Zone"].isin(zone_index.zones).to_numpy() & valid_stamp
+    indexes = {}
+    for zone, stamp in frame.loc[known_zone, ["Zone", "Timestamp"]].drop_duplicates().itertuples(index=False):
+        year = shards.survey_year(stamp)
+        indexes[(zone, year)] = shards.duplicate_indexes(zone, year)
+    for index in {id(index): index for group in indexes.values() for index in group}.values():
+        index.sync(force=True)
+
+    keys = pd.Series(
+        [make_key(*key) for key in zip(*(frame[column] for column in
+                                         ("Head Teacher", "Phone", "WhatsApp", "Region", "Division")))],
+        index=frame.index
+    )
+    in_sheet = np.array([
+        known and any(key in index for index in indexes[(zone, shards.survey_year(stamp))])
+        for key, zone, stamp, known in zip(keys, frame["Zone"], frame["Timestamp"], known_zone)
+    ], dtype=bool)
+    errors = errors.where(~in_sheet, errors + "Already exists in the sheet; ")
+    in_file = keys.duplicated().to_numpy()
+    errors = errors.where(~in_file, errors + "Duplicate of an earlier row in this file; ")
+
+    valid = (errors == "").to_numpy()
+    rejected = frame.loc[~valid].drop(columns="Shard").assign(Errors=errors[~valid].str.rstrip("; "))
+
+    accepted = frame.loc[valid].copy()
+    accepted[list(NUMERIC_COLUMNS)] = numbers.loc[valid].astype("int64")
+    rows = {}
+    for shard, group in accepted.groupby("Shard", sort=False):
+        rows[shard] = group[list(HEADERS)].astype(object).to_numpy().tolist()
+    return rows, rejected
+
+
+def append_chunks(rows, worksheet_name, chunk_size=CHUNK_SIZE, pause=CHUNK_PAUSE):
+    """Append rows in chunks, retrying each chunk with exponential backoff"""
+    written = 0
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+
+        def write(worksheet):
+            ensure_headers(worksheet, list(HEADERS))
+            worksheet.append_rows(chunk)
+
+        for attempt in range(MAX_RETRIES):
+            try:
+                with_worksheet(write, worksheet_name, kind=WRITE, create=True)
+                break
+            except Exception as e:
+                if attempt == MAX_RETRIES - 1:
+                    raise RuntimeError(f"Gave up after {written} rows: {e}") from e
+                time.sleep(min(60, 2 ** attempt))
+        written += len(chunk)
+        try:
+            aggregates.add_rows(list(HEADERS), chunk, worksheet_name)
+        except Exception as e:
+            print(f"Summary aggregates not updated ({e}); run aggregates.py --rebuild", file=sys.stderr)
+        print(f"Appended {written}/{len(rows)} rows", file=sys.stderr)
+        if start + chunk_size < len(rows):
+            time.sleep(pause)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bulk import schools from CSV/XLSX into their zone/year worksheets. "
+                    "Rows already in the sheet are skipped, so an interrupted import can simply be re-run."
+    )
+    parser.add_argument("path", help="CSV or XLSX file with the worksheet's column headers")
+    parser.add_argument("--sheet", help="Excel sheet name (default: first sheet)")
+    parser.add_argument("--errors", help="Where to write rejected rows (default: <path>.errors.csv)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows per append_rows call")
+    parser.add_argument("--pause", type=float, default=CHUNK_PAUSE, help="Seconds between append_rows calls")
+    parser.add_argument("--dry-run", action="store_true", help="Validate only; write nothing to the sheet")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    frame = read_table(args.path, args.sheet)
+    try:
+        rows, rejected = prepare(frame, load_zone_index())
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
+
+    valid = sum(len(shard_rows) for shard_rows in rows.values())
+    print(f"{len(frame)} rows read, {valid} valid, {len(rejected)} rejected", file=sys.stderr)
+    if len(rejected):
+        errors_path = args.errors or os.path.splitext(args.path)[0] + ".errors.csv"
+        rejected.to_csv(errors_path, index=False)
+        print(f"Rejected rows written to {errors_path}", file=sys.stderr)
+
+    if not args.dry_run:
+        for shard, shard_rows in rows.items():
+            print(f"Writing {len(shard_rows)} rows to '{shard}'", file=sys.stderr)
+            append_chunks(shard_rows, shard, chunk_size=args.chunk_size, pause=args.pause)
+    print(f"Done in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,33 @@
 import os
-from dotenv import load_dotenv
-from oauth2client.service_account import ServiceAccountCredentials
-import gspread
+import time
+import datetime
+import threading
+from health import breaker
+from metrics import InstrumentedWorksheet
+from scheduler import READ, scheduler
+from schema import HEADERS
 
+# dotenv, oauth2client, gspread and google.auth are imported where they are
+# used: together they cost several hundred milliseconds at interpreter start.
 
-# Load environment variables from .env file
-load_dotenv()
+SPREADSHEET_NAME = "DL Schools"
+WORKSHEET_NAME = "DL"
+
+# Refresh the access token this many seconds before it expires
+TOKEN_REFRESH_MARGIN = 300
+# How often the background refresher checks the token expiry (seconds)
+TOKEN_CHECK_INTERVAL = 60
+# Upper bound on each Sheets HTTP request (seconds)
+REQUEST_TIMEOUT = float(os.getenv("DL_SHEETS_TIMEOUT", "10"))
 
 def cred():
+    from dotenv import load_dotenv
+    from oauth2client.service_account import ServiceAccountCredentials
+    import gspread
+
+    # Load environment variables from .env file
+    load_dotenv()
+
     SCOPES = [
         "https://www.googleapis.com/auth/spreadsheets",
         "https://www.googleapis.com/auth/drive"
@@ -41,3 +61,188 @@ def cred():
     client = gspread.authorize(creds)
     return client
 
+
+def _credentials_of(client):
+    """Return the credentials object backing a gspread client"""
+    http_client = getattr(client, "http_client", None)
+    return getattr(http_client, "auth", None) or getattr(client, "auth", None)
+
+
+def _seconds_to_expiry(creds):
+    """Seconds until the current access token expires (0 if none was issued yet)"""
+    # google-auth exposes `expiry`, oauth2client exposes `token_expiry`; both are naive UTC
+    expiry = getattr(creds, "expiry", None) or getattr(creds, "token_expiry", None)
+    if expiry is None:
+        return 0
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    return (expiry - now).total_seconds()
+
+
+def _refresh_credentials(creds):
+    """Fetch a new access token for either oauth2client or google-auth credentials"""
+    if hasattr(creds, "token_expiry"):
+        import httplib2
+        creds.refresh(httplib2.Http())
+    else:
+        from google.auth.transport.requests import Request
+        creds.refresh(Request())
+
+
+class SheetsPool:
+    """Process-wide, thread-safe cache of the Sheets client and worksheet handles.
+
+    The client is authorized once and its access token is refreshed in the
+    background shortly before it expires, so warm callers make no auth calls.
+    """
+
+    def __init__(self, factory=None):
+        self._factory = factory
+        self._lock = threading.RLock()
+        self._client = None
+        self._spreadsheet = None
+        self._worksheets = {}
+        self._refresher = None
+
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                # Resolve `cred` at call time so it can be swapped out (e.g. for a fake backend)
+                factory = self._factory or cred
+                self._client = factory()
+                if hasattr(self._client, "set_timeout"):
+                    self._client.set_timeout(REQUEST_TIMEOUT)
+                self._start_refresher()
+            return self._client
+
+    def spreadsheet(self):
+        with self._lock:
+            if self._spreadsheet is None:
+                self._spreadsheet = self.client().open(SPREADSHEET_NAME)
+            return self._spreadsheet
+
+    def worksheet(self, name=WORKSHEET_NAME, create=False):
+        """Return a worksheet handle.
+
+        A missing worksheet raises gspread's WorksheetNotFound unless `create`
+        is set; writers create it empty and write their own header row.
+        """
+        with self._lock:
+            if name not in self._worksheets:
+                spreadsheet = self.spreadsheet()
+                try:
+                    worksheet = spreadsheet.worksheet(name)
+                except Exception as e:
+                    if not (create and is_worksheet_not_found(e)):
+                        raise
+                    worksheet = spreadsheet.add_worksheet(title=name, rows=1000, cols=len(HEADERS))
+                self._worksheets[name] = InstrumentedWorksheet(worksheet)
+            return self._worksheets[name]
+
+    def reconnect(self):
+        """Drop the cached client and handles so the next call re-authorizes"""
+        with self._lock:
+            self._client = None
+            self._spreadsheet = None
+            self._worksheets = {}
+
+    def refresh_if_needed(self):
+        """Refresh the pooled client's token if it is close to expiring"""
+        with self._lock:
+            client = self._client
+        if client is None:
+            return
+        creds = _credentials_of(client)
+        if creds is None or _seconds_to_expiry(creds) > TOKEN_REFRESH_MARGIN:
+            return
+        try:
+            _refresh_credentials(creds)
+        except Exception:
+            # Let the next caller rebuild the client from scratch
+            self.reconnect()
+
+    def _start_refresher(self):
+        if self._refresher is not None and self._refresher.is_alive():
+            return
+        self._refresher = threading.Thread(
+            target=self._refresh_loop, name="sheets-token-refresher", daemon=True
+        )
+        self._refresher.start()
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(TOKEN_CHECK_INTERVAL)
+            self.refresh_if_needed()
+
+
+_pool = SheetsPool()
+
+
+def get_client():
+    """Return the pooled, authorized gspread client"""
+    return _pool.client()
+
+
+def get_worksheet(name=WORKSHEET_NAME):
+    """Return the pooled handle for a worksheet of the DL Schools spreadsheet"""
+    return _pool.worksheet(name)
+
+
+def reconnect():
+    """Force the pool to re-authorize on next use"""
+    _pool.reconnect()
+
+
+def _call_with_reconnect(fn, get_target):
+    try:
+        return fn(get_target())
+    except Exception as e:
+        from google.auth.exceptions import RefreshError, TransportError
+        if not isinstance(e, (RefreshError, TransportError)):
+            raise
+        _pool.reconnect()
+        return fn(get_target())
+
+
+def is_worksheet_not_found(error):
+    from gspread.exceptions import WorksheetNotFound
+    return isinstance(error, WorksheetNotFound)
+
+
+_RAISE = object()
+
+
+def with_worksheet(fn, name=WORKSHEET_NAME, kind=READ, key=None, priority=None, create=False, missing=_RAISE):
+    """Call fn(worksheet), reconnecting and retrying once on auth/transport errors.
+
+    Calls go through the shared circuit breaker, so once Sheets has failed
+    repeatedly they raise health.CircuitOpenError immediately, and then through
+    the quota scheduler. Concurrent reads passing the same `key` share one request.
+    Only writers should pass `create`; readers pass `missing`, which is returned
+    instead of calling fn when the worksheet does not exist (yet).
+    """
+    def call():
+        try:
+            return _call_with_reconnect(fn, lambda: _pool.worksheet(name, create))
+        except Exception as e:
+            if missing is _RAISE or not is_worksheet_not_found(e):
+                raise
+            return missing
+
+    return breaker.call(
+        scheduler.run,
+        call,
+        kind=kind,
+        key=None if key is None else (name, key),
+        priority=priority
+    )
+
+
+def with_spreadsheet(fn, kind=READ, key=None, priority=None):
+    """Like with_worksheet, but calls fn(spreadsheet)"""
+    return breaker.call(
+        scheduler.run,
+        lambda: _call_with_reconnect(fn, _pool.spreadsheet),
+        kind=kind,
+        key=None if key is None else ("spreadsheet", key),
+        priority=priority
+    )
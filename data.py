@@ -1,26 +1,34 @@
 import streamlit as st
-import pandas as pd
 import re
 import datetime
-from connect import cred
-import gspread
-from google.auth.exceptions import RefreshError, TransportError
+import fuzzy
+import health
+import jobs
+import metrics
+import shards
+from duplicates import make_key
+from schema import (
+    FIELD_BY_COLUMN, FORM_MESSAGES, LAYOUT, PUPIL_LABELS, SECTIONS, TIMESTAMP_FORMAT, SessionRecord, format_name,
+    validate
+)
+from submissions import DUPLICATE_MESSAGE, submit_record
+from zones import ZoneIndex, load_zone_index
 
 
 class DeeperLifeSurvey:
+    @metrics.traced("survey.init")
     def __init__(self):
         self.initialize_session_state()
         
-        # Initialize data frame here so it exists before other methods use it
+        # Zone hierarchy is compiled once per process and shared by all sessions
         try:
-            self.df = pd.read_csv(r"zone - Original.csv")
-            self.df.columns = [col.strip() for col in self.df.columns]  # Clean column names
+            self.zones = load_zone_index()
         except FileNotFoundError:
             st.error(
                 "Error: The CSV file was not found. Please make sure "
                 "'zone - Original.csv' is in the correct directory."
             )
-            self.df = pd.DataFrame(columns=['ZONE', 'REGION', 'DIVISION'])  # Empty fallback
+            self.zones = ZoneIndex(())  # Empty fallback
 
     def initialize_session_state(self):
         # Page navigation
@@ -32,326 +40,221 @@ class DeeperLifeSurvey:
             st.session_state.basic_info_valid = False
         if "pupil_data_valid" not in st.session_state:
             st.session_state.pupil_data_valid = False
-        if "financial_data_valid" not in st.session_state:
-            st.session_state.financial_data_valid = False
-        if "staff_counts_valid" not in st.session_state:
-            st.session_state.staff_counts_valid = False
             
-        # Form data
-        if "school_info" not in st.session_state:
-            st.session_state.school_info = {
-                "zone": None,
-                "region": None,
-                "division": None,
-                "school_name": "",
-                "head_teacher": "",
-                "phone": "",
-                "whatsapp": ""
-            }
+        # Background submission tracking
+        if "submission_job" not in st.session_state:
+            st.session_state.submission_job = None
+        if "submission_reported" not in st.session_state:
+            st.session_state.submission_reported = None
             
-        if "staff_counts" not in st.session_state:
-            st.session_state.staff_counts = {
-                "teaching_staff_count": 0,
-                "non_teaching_staff_count": 0,
-                "committee_members_count": 0
-            }
-            
-        if "financial_data" not in st.session_state:
-            st.session_state.financial_data = {
-                "admission_fees": 0,
-                "canteen_fees": 0,
-                "stationary_fees": 0,
-                "head_salary": 0,
-                "lowest_teacher_salary": 0,
-                "highest_teacher_salary": 0
-            }
-        if "class_data" not in st.session_state:
-            st.session_state.class_data = {
-                "Creche/Nursery": {"males": 0, "females": 0, "tuition": 0},
-                "K.G 1": {"males": 0, "females": 0, "tuition": 0},
-                "K.G 2": {"males": 0, "females": 0, "tuition": 0},
-                "Class 1": {"males": 0, "females": 0, "tuition": 0},
-                "Class 2": {"males": 0, "females": 0, "tuition": 0},
-                "Class 3": {"males": 0, "females": 0, "tuition": 0},
-                "Class 4": {"males": 0, "females": 0, "tuition": 0},
-                "Class 5": {"males": 0, "females": 0, "tuition": 0},
-                "Class 6": {"males": 0, "females": 0, "tuition": 0},
-                "JHS 1": {"males": 0, "females": 0, "tuition": 0},
-                "JHS 2": {"males": 0, "females": 0, "tuition": 0},
-                "JHS 3": {"males": 0, "females": 0, "tuition": 0}
-            }
+        # Form data: one flat row per session, laid out as the worksheet headers
+        if "record" not in st.session_state:
+            st.session_state.record = SessionRecord()
 
     def format_name(self, name):
         """Capitalize names properly"""
-        return " ".join(word.capitalize() for word in name.split())
+        return format_name(name)
     
     def validate_phone(self, number):
         """Validate 10-digit phone number"""
         return re.match(r'^\d{10}$', number) is not None
 
+    @metrics.traced("check_duplicate_entry")
     def check_duplicate_entry(self):
         """Check if the headmaster's details already exist in the database"""
         try:
-            client = cred()
-            spreadsheet = client.open("DL Schools")
-            worksheet = spreadsheet.worksheet("DL")
-            
-            # Get all existing data
-            existing_data = worksheet.get_all_records()
-            
             # Check for duplicates based on headmaster name, phone, whatsapp, region, and division
-            formatted_head_teacher = self.format_name(st.session_state.school_info["head_teacher"])
-            
-            for record in existing_data:
-                if (record.get("Head Teacher", "") == formatted_head_teacher and
-                    record.get("Phone", "") == st.session_state.school_info["phone"] and
-                    record.get("WhatsApp", "") == st.session_state.school_info["whatsapp"] and
-                    record.get("Region", "") == st.session_state.school_info["region"] and
-                    record.get("Division", "") == st.session_state.school_info["division"]):
-                    return True
-            return False
+            record = st.session_state.record
+            key = make_key(
+                self.format_name(record["Head Teacher"]),
+                record["Phone"],
+                record["WhatsApp"],
+                record["Region"],
+                record["Division"]
+            )
+            # Only the zone's shard (and the pre-sharding sheet) can hold a match
+            return shards.is_duplicate(key, record["Zone"])
         except Exception as e:
             st.error(f"Error checking for duplicates: {str(e)}")
             return False
 
+    @metrics.traced("near_duplicates")
+    def near_duplicate_warning(self):
+        """Show schools in the same division that look like this one (typos, changed numbers)"""
+        record = st.session_state.record
+        if not (record["Division"] and record["School Name"] and record["Head Teacher"]):
+            return
+        try:
+            matches = fuzzy.find_similar(
+                record["School Name"],
+                record["Head Teacher"],
+                record["Zone"],
+                record["Region"],
+                record["Division"]
+            )
+        except Exception:
+            return  # Advisory only; the exact duplicate check still runs on Next
+        if matches:
+            st.warning(
+                "⚠️ Similar schools have already been submitted in this division. "
+                "Please make sure this is not a repeat submission."
+            )
+            st.dataframe(matches, hide_index=True)
+
+    def seed_widget(self, field):
+        """Put the record's value behind a keyed widget that has none yet.
+
+        Streamlit drops the state of widgets that were not drawn on the last
+        run, so this is what keeps values across page changes.
+        """
+        if field.key not in st.session_state:
+            st.session_state[field.key] = st.session_state.record[field.column]
+
+    def number_input(self, container, field):
+        self.seed_widget(field)
+        value = container.number_input(field.label, min_value=0, max_value=field.max_value, step=1, key=field.key)
+        st.session_state.record[field.column] = value
+
+    def choice_input(self, field, options):
+        self.seed_widget(field)
+        if st.session_state[field.key] not in options:
+            # A value from a different zone or region
+            st.session_state[field.key] = None
+        st.session_state.record[field.column] = st.selectbox(
+            field.label,
+            options=options,
+            index=None,
+            placeholder=f"Select a {field.column.lower()}...",
+            key=field.key
+        )
+
+    def text_input(self, container, field):
+        self.seed_widget(field)
+        value = container.text_input(field.label, max_chars=field.max_chars, key=field.key).strip()
+        st.session_state.record[field.column] = value
+        return value
+
+    @metrics.traced("section.school_info")
     def school_info_section(self):
         with st.container(border=True):
             st.subheader("Basic Information")
 
-            zones = self.df['ZONE'].unique()
-            st.session_state.school_info["zone"] = st.selectbox(
-                "Zone*", 
-                options=zones, 
-                index=None, 
-                placeholder="Select a zone...",
-                key="zone_select"
-            )
+            record = st.session_state.record
+            fields = FIELD_BY_COLUMN
+            self.choice_input(fields["Zone"], self.zones.zones)
+            if record["Zone"]:
+                self.choice_input(fields["Region"], self.zones.regions(record["Zone"]))
+            if record["Region"]:
+                self.choice_input(fields["Division"], self.zones.divisions(record["Zone"], record["Region"]))
 
-            if st.session_state.school_info["zone"]:
-                regions = self.df[self.df['ZONE'] == st.session_state.school_info["zone"]]['REGION'].unique()
-                st.session_state.school_info["region"] = st.selectbox(
-                    "Region*", 
-                    options=regions, 
-                    index=None, 
-                    placeholder="Select a region...",
-                    key="region_select"
-                )
-
-            if st.session_state.school_info["region"]:
-                divisions = self.df[self.df['REGION'] == st.session_state.school_info["region"]]['DIVISION'].unique()
-                st.session_state.school_info["division"] = st.selectbox(
-                    "Division*", 
-                    options=divisions, 
-                    index=None, 
-                    placeholder="Select a division...",
-                    key="division_select"
-                )
-
-            st.session_state.school_info["school_name"] = st.text_input(
-                "Name of School*", 
-                max_chars=100,
-                value=st.session_state.school_info["school_name"]
-            ).strip()
-            
-            st.session_state.school_info["head_teacher"] = st.text_input(
-                "Name of Head Teacher*", 
-                max_chars=100,
-                value=st.session_state.school_info["head_teacher"]
-            ).strip()
+            self.text_input(st, fields["School Name"])
+            self.text_input(st, fields["Head Teacher"])
             
             col1, col2 = st.columns(2)
-            st.session_state.school_info["phone"] = col1.text_input(
-                "Phone Number of Head Teacher*", 
-                max_chars=10,
-                value=st.session_state.school_info["phone"]
-            )
-            
-            st.session_state.school_info["whatsapp"] = col2.text_input(
-                "WhatsApp Number of Head Teacher*", 
-                max_chars=10,
-                value=st.session_state.school_info["whatsapp"]
-            )
-            
-            if st.session_state.school_info["phone"] and not self.validate_phone(st.session_state.school_info["phone"]):
-                col1.error("Must be 10 digits")
-            if st.session_state.school_info["whatsapp"] and not self.validate_phone(st.session_state.school_info["whatsapp"]):
-                col2.error("Must be 10 digits")
+            for col, column in ((col1, "Phone"), (col2, "WhatsApp")):
+                value = self.text_input(col, fields[column])
+                if value and not self.validate_phone(value):
+                    col.error("Must be 10 digits")
 
+    def sync_pupil_widgets(self):
+        """Copy the per-class number inputs into the record"""
+        record = st.session_state.record
+        for _, fields in LAYOUT["pupils"]:
+            for field in fields:
+                if field.key in st.session_state:
+                    record[field.column] = st.session_state[field.key]
+
+    @st.fragment
+    @metrics.traced("section.pupils")
     def pupils_section(self):
+        """Pupil numbers; edits rerun only this fragment, not the whole page"""
         with st.container(border=True):
             st.subheader("Pupil Data by Class")
-            class_levels = list(st.session_state.class_data.keys())
+            mode = st.radio(
+                "Entry mode",
+                ["One class at a time", "All classes in a table"],
+                horizontal=True,
+                key="pupil_entry_mode"
+            )
+            if mode == "All classes in a table":
+                self.pupils_grid()
+                return
             
-            for level in class_levels:
+            for level, fields in LAYOUT["pupils"]:
                 with st.expander(level, expanded=False):
-                    cols = st.columns(3)
-                    males = cols[0].number_input("Males*", min_value=0, key=f"{level}_males")
-                    females = cols[1].number_input("Females*", min_value=0, key=f"{level}_females")
-                    tuition = cols[2].number_input("Tuition Fees (GHS)*", min_value=0, key=f"{level}_tuition")
-                    
-                    st.session_state.class_data[level] = {
-                        "males": males,
-                        "females": females,
-                        "tuition": tuition
-                    }
+                    for col, field in zip(st.columns(len(fields)), fields):
+                        self.number_input(col, field)
 
+    def pupils_grid(self):
+        """Enter every class in one table and commit it with a single submit"""
+        record = st.session_state.record
+        labels = [label.rstrip("*") for label in PUPIL_LABELS.values()]
+        rows = [
+            {"Class": level, **{label: record[field.column] for label, field in zip(labels, fields)}}
+            for level, fields in LAYOUT["pupils"]
+        ]
+        with st.form("pupil_grid_form", border=False):
+            edited = st.data_editor(
+                rows,
+                hide_index=True,
+                disabled=["Class"],
+                column_config={
+                    label: st.column_config.NumberColumn(label + "*", min_value=0, step=1, format="%d")
+                    for label in labels
+                },
+                key="pupil_grid"
+            )
+            saved = st.form_submit_button("Save pupil data")
+        if not saved:
+            return
+        
+        for row, (_, fields) in zip(edited, LAYOUT["pupils"]):
+            for label, field in zip(labels, fields):
+                # Cleared cells come back empty
+                record[field.column] = st.session_state[field.key] = int(row[label] or 0)
+        st.success("Pupil data saved")
+
+    @metrics.traced("section.financial")
     def financial_section(self):
         with st.container(border=True):
             st.subheader("Fees & Salaries")
             
-            st.write("**Fees (GHS)**")
-            col1, col2, col3 = st.columns(3)
-            st.session_state.financial_data["admission_fees"] = col1.number_input(
-                "Admission Fees*", 
-                min_value=0, 
-                value=st.session_state.financial_data["admission_fees"],
-                key="admission_fees"
-            )
-            
-            st.session_state.financial_data["canteen_fees"] = col2.number_input(
-                "Canteen Fees*", 
-                min_value=0, 
-                value=st.session_state.financial_data["canteen_fees"],
-                key="canteen_fees"
-            )
-            
-            st.session_state.financial_data["stationary_fees"] = col3.number_input(
-                "Stationary Fees*", 
-                min_value=0, 
-                value=st.session_state.financial_data["stationary_fees"],
-                key="stationary_fees"
-            )
-            
-            st.write("**Salary Ranges (GHS)**")
-            col4, col5, col6 = st.columns(3)
-            st.session_state.financial_data["head_salary"] = col4.number_input(
-                "Head Teacher Salary*", 
-                min_value=0, 
-                value=st.session_state.financial_data["head_salary"],
-                key="head_salary"
-            )
-            
-            st.session_state.financial_data["lowest_teacher_salary"] = col5.number_input(
-                "Lowest Teacher Salary*", 
-                min_value=0, 
-                value=st.session_state.financial_data["lowest_teacher_salary"],
-                key="lowest_salary"
-            )
-            
-            st.session_state.financial_data["highest_teacher_salary"] = col6.number_input(
-                "Highest Teacher Salary*", 
-                min_value=0, 
-                value=st.session_state.financial_data["highest_teacher_salary"],
-                key="highest_salary"
-            )
+            for group, fields in LAYOUT["financial"]:
+                st.write(f"**{group}**")
+                for col, field in zip(st.columns(len(fields)), fields):
+                    self.number_input(col, field)
 
+    @metrics.traced("section.staff_counts")
     def staff_counts_section(self):
         with st.container(border=True):
             st.subheader("Staff Counts")
             
-            col1, col2, col3 = st.columns(3)
-            
-            st.session_state.staff_counts["teaching_staff_count"] = col1.number_input(
-                "Number of Teaching Staff*",
-                min_value=0,
-                max_value=100,
-                step=1,
-                key="teaching_staff_count"
-            )
-            
-            st.session_state.staff_counts["non_teaching_staff_count"] = col2.number_input(
-                "Number of Non-Teaching Staff*",
-                min_value=0,
-                max_value=100,
-                step=1,
-                key="non_teaching_staff_count"
-            )
-            
-            st.session_state.staff_counts["committee_members_count"] = col3.number_input(
-                "Number of Committee Members*",
-                min_value=0,
-                max_value=50,
-                step=1,
-                key="committee_members_count"
-            )
+            for _, fields in LAYOUT["staff"]:
+                for col, field in zip(st.columns(len(fields)), fields):
+                    self.number_input(col, field)
 
-    def validate_basic_info(self):
-        required_fields = [
-            st.session_state.school_info["zone"], 
-            st.session_state.school_info["region"], 
-            st.session_state.school_info["division"], 
-            st.session_state.school_info["school_name"], 
-            st.session_state.school_info["head_teacher"],
-            st.session_state.school_info["phone"],
-            st.session_state.school_info["whatsapp"]
-        ]
-        
-        if not all(required_fields):
-            st.error("All required fields in School Information must be filled")
-            return False
-            
-        if not self.validate_phone(st.session_state.school_info["phone"]):
-            st.error("Valid 10-digit phone number required for Head Teacher")
-            return False
-            
-        if not self.validate_phone(st.session_state.school_info["whatsapp"]):
-            st.error("Valid 10-digit WhatsApp number required for Head Teacher")
+    def validate(self, sections, check_duplicates=False):
+        """Run the schema's validator over some sections and show the first problem"""
+        errors = validate(st.session_state.record.row(), sections=sections, messages=FORM_MESSAGES)
+        if errors:
+            st.error(errors[0])
             return False
         
         # Check for duplicate entry
-        if self.check_duplicate_entry():
-            st.error("This headmaster's information already exists in the database for this region and division.")
-            return False
-            
-        return True
-
-    def validate_pupil_data(self):
-        # Check if all classes have data
-        for level, values in st.session_state.class_data.items():
-            if values["males"] == 0 and values["females"] == 0 and values["tuition"] == 0:
-                st.error(f"Pupil Data is required for {level}. Please enter data for all classes.")
-                return False
-                
-        return True
-
-    def validate_financial_data(self):
-        # Check if all financial fields are filled
-        required_financial_fields = [
-            st.session_state.financial_data["admission_fees"],
-            st.session_state.financial_data["canteen_fees"],
-            st.session_state.financial_data["stationary_fees"],
-            st.session_state.financial_data["head_salary"],
-            st.session_state.financial_data["lowest_teacher_salary"],
-            st.session_state.financial_data["highest_teacher_salary"]
-        ]
-        
-        if not all(required_financial_fields):
-            st.error("All financial fields are required.")
-            return False
-            
-        return True
-
-    def validate_staff_counts(self):
-        # Check if all staff count fields are filled
-        required_staff_fields = [
-            st.session_state.staff_counts["teaching_staff_count"],
-            st.session_state.staff_counts["non_teaching_staff_count"],
-            st.session_state.staff_counts["committee_members_count"]
-        ]
-        
-        if not all(required_staff_fields):
-            st.error("All staff count fields are required.")
+        if check_duplicates and self.check_duplicate_entry():
+            st.error(DUPLICATE_MESSAGE)
             return False
             
         return True
 
     def next_page_callback(self):
         if st.session_state.current_page == 1:
-            if self.validate_basic_info():
+            if self.validate(("school_info",), check_duplicates=True):
                 st.session_state.basic_info_valid = True
                 st.session_state.current_page = 2
         elif st.session_state.current_page == 2:
-            if self.validate_pupil_data():
+            self.sync_pupil_widgets()
+            if self.validate(("pupils",)):
                 st.session_state.pupil_data_valid = True
                 st.session_state.current_page = 3
 
@@ -359,96 +262,67 @@ class DeeperLifeSurvey:
         if st.session_state.current_page > 1:
             st.session_state.current_page -= 1
 
+    @metrics.traced("flatten_data")
     def flatten_data(self):
         """Flatten all data into a single row for Google Sheets in the specified order"""
-        data = {}
-        
-        # Add timestamp first
-        data.update({
-            "Timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        })
-        
-        # 1. Basic information
-        data.update({
-            "Zone": st.session_state.school_info["zone"],
-            "Region": st.session_state.school_info["region"],
-            "Division": st.session_state.school_info["division"],
-            "School Name": self.format_name(st.session_state.school_info["school_name"]),
-            "Head Teacher": self.format_name(st.session_state.school_info["head_teacher"]),
-            "Phone": st.session_state.school_info["phone"],
-            "WhatsApp": st.session_state.school_info["whatsapp"],
-        })
-        
-        # 2. Pupil Data by Class
-        for level, values in st.session_state.class_data.items():
-            data.update({
-                f"{level} Males": values["males"],
-                f"{level} Females": values["females"],
-                f"{level} Tuition": values["tuition"]
-            })
-        
-        # 3. Fees and Salaries
-        data.update({
-            "Admission Fees": st.session_state.financial_data["admission_fees"],
-            "Canteen Fees": st.session_state.financial_data["canteen_fees"],
-            "Stationary Fees": st.session_state.financial_data["stationary_fees"],
-            "Head Teacher Salary": st.session_state.financial_data["head_salary"],
-            "Lowest Teacher Salary": st.session_state.financial_data["lowest_teacher_salary"],
-            "Highest Teacher Salary": st.session_state.financial_data["highest_teacher_salary"]
-        })
-        
-        # 4. Staff counts
-        data.update({
-            "Number of Teaching Staff": st.session_state.staff_counts["teaching_staff_count"],
-            "Number of Non-Teaching Staff": st.session_state.staff_counts["non_teaching_staff_count"],
-            "Number of Committee Members": st.session_state.staff_counts["committee_members_count"]
-        })
-        
-        return data
+        timestamp = datetime.datetime.now().strftime(TIMESTAMP_FORMAT)
+        return st.session_state.record.as_record(timestamp)
 
+    @metrics.traced("submit_data")
     def submit_data(self):
-        try:
-            # Validate all sections before submission
-            if not (self.validate_basic_info() and self.validate_pupil_data() and 
-                   self.validate_financial_data() and self.validate_staff_counts()):
-                st.error("Please complete all required fields before submitting.")
-                return
-                
-            # Get all flattened data
-            data = self.flatten_data()
+        # Ignore re-clicks while this session's submission is still running
+        if jobs.is_active(st.session_state.submission_job):
+            return
             
-            client = cred()
-            spreadsheet = client.open("DL Schools")
-            worksheet = spreadsheet.worksheet("DL")
+        # Validate all sections before submission; the duplicate check runs in the background job
+        if not self.validate(SECTIONS):
+            st.error("Please complete all required fields before submitting.")
+            return
             
-            # Check if the sheet is empty (no headers)
-            existing_data = worksheet.get_all_values()
-            if len(existing_data) == 0:
-                # Add headers as the first row
-                headers = list(data.keys())
-                worksheet.append_row(headers)
-            
-            # Append all data as a single row
-            worksheet.append_row(list(data.values()))
-            st.success("✅ Data submitted successfully!")
+        # Get all flattened data
+        data = self.flatten_data()
+        
+        try:
+            st.session_state.submission_job = jobs.submit(submit_record, data)
+        except jobs.JobQueueFull:
+            st.error("The server is busy. Please try submitting again in a moment.")
+
+    @st.fragment(run_every=1)
+    def submission_status(self):
+        """Poll the background submission without rerunning the whole page"""
+        job = jobs.get(st.session_state.submission_job)
+        if job is None or job.done:
+            # Full rerun: shows the result and stops polling
+            st.rerun()
+        st.info("⏳ Submitting your data...")
+
+    def submission_result(self, job):
+        ok, message = job.result
+        if ok:
+            st.success(message)
+        else:
+            st.error(message)
+        # Celebrate once per submission, not on every later rerun
+        if ok and st.session_state.submission_reported != job.id:
+            st.session_state.submission_reported = job.id
             st.balloons()
-            
-        except Exception as e:
-            st.error(f"Submission failed: {str(e)}")
 
     def page_one(self):
         """First page with Basic Information"""
         st.subheader("Deeper Life Basic Schools - Page 1/3")
         
-        try:
-            client = cred()
-            spreadsheet = client.open("DL Schools")
-            worksheet = spreadsheet.worksheet("DL")
+        # Read the cached probe result; the monitor thread does the network I/O
+        health.start()
+        network = health.status()
+        if network == health.UP:
             st.success("✅ Network Active!")
-        except:
+        elif network == health.DOWN:
             st.warning("⚠️ Network connection issue detected")
+        else:
+            st.info("⏳ Checking network connection...")
         
         self.school_info_section()
+        self.near_duplicate_warning()
         
         # Navigation buttons
         col1, col2 = st.columns([1, 4])
@@ -491,18 +365,30 @@ class DeeperLifeSurvey:
         col1, col2, col3 = st.columns([1, 1, 2])
         with col1:
             st.button("Previous", on_click=self.prev_page_callback)
+        job = jobs.get(st.session_state.submission_job)
         with col3:
-            if st.button("Submit Data", type="primary"):
-                self.submit_data()
+            st.button(
+                "Submit Data",
+                type="primary",
+                on_click=self.submit_data,
+                disabled=job is not None and not job.done
+            )
+        
+        if job is not None:
+            if job.done:
+                self.submission_result(job)
+            else:
+                self.submission_status()
 
     def run(self):
         """Main method to run the app with page navigation"""
-        if st.session_state.current_page == 1:
-            self.page_one()
-        elif st.session_state.current_page == 2:
-            self.page_two()
-        elif st.session_state.current_page == 3:
-            self.page_three()
+        with metrics.span(f"page.{st.session_state.current_page}"):
+            if st.session_state.current_page == 1:
+                self.page_one()
+            elif st.session_state.current_page == 2:
+                self.page_two()
+            elif st.session_state.current_page == 3:
+                self.page_three()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,103 @@
+import re
+import threading
+import sharedcache
+from connect import WORKSHEET_NAME
+from schema import clean_phone
+from snapshot import get_snapshot
+
+
+# Columns that identify a school submission
+KEY_COLUMNS = ("Head Teacher", "Phone", "WhatsApp", "Region", "Division")
+
+
+def _normalize_phone(value):
+    """Reduce a phone number to its digits, restoring a leading zero Sheets may have dropped"""
+    digits = re.sub(r"\D", "", clean_phone(value))
+    return digits.zfill(10) if digits else ""
+
+
+def make_key(head_teacher, phone, whatsapp, region, division):
+    """Build the normalized duplicate-detection key for a school"""
+    return (
+        " ".join(str(head_teacher).split()).casefold(),
+        _normalize_phone(phone),
+        _normalize_phone(whatsapp),
+        str(region).strip(),
+        str(division).strip(),
+    )
+
+
+def record_key(record):
+    """Build the duplicate-detection key from a flattened row (see flatten_data)"""
+    return make_key(*(record.get(column, "") for column in KEY_COLUMNS))
+
+
+class DuplicateIndex:
+    """Hash set of school keys for one worksheet, fed from its local snapshot.
+
+    Each sync consumes only the snapshot rows added since the previous one, so a
+    warm check is a set lookup plus (at most every SYNC_INTERVAL seconds) a small
+    delta read of the sheet. Keys of rows submitted but not yet in the sheet are
+    shared with the other processes on the host through the shared cache.
+    """
+
+    def __init__(self, worksheet_name=WORKSHEET_NAME):
+        self.worksheet_name = worksheet_name
+        self.snapshot = get_snapshot(worksheet_name)
+        self._keys = set()
+        self._local = set()  # submissions from this host, kept across reconciles until the sheet has them
+        self._shared_id = 0  # last shared-cache key already merged into _local
+        self._rows = 0  # snapshot rows already indexed
+        self._generation = None  # snapshot reconcile count the keys were built from
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        return key in self._keys or key in self._local
+
+    def __len__(self):
+        return len(self._keys | self._local)
+
+    def add(self, record):
+        """Record one of our own successful submissions without a round trip"""
+        key = record_key(record)
+        with self._lock:
+            self._local.add(key)
+        sharedcache.add_key(self.worksheet_name, key)
+
+    def sync(self, force=False):
+        """Refresh the snapshot (rate limited unless forced) and index its new rows"""
+        with self._lock:
+            self.snapshot.sync(force)
+            self._consume()
+
+    def _consume(self):
+        self._shared_id, shared = sharedcache.keys_since(self.worksheet_name, self._shared_id)
+        self._local.update(shared)
+
+        meta, columns = self.snapshot.read()
+        if meta["generation"] != self._generation:
+            # A full reconcile may have changed or removed rows; start over
+            self._keys = set()
+            self._rows = 0
+            self._generation = meta["generation"]
+        if meta["rows"] <= self._rows:
+            return
+
+        key_columns = [columns[column][self._rows:meta["rows"]] for column in KEY_COLUMNS]
+        for values in zip(*key_columns):
+            if any(values):
+                self._keys.add(make_key(*values))
+        self._rows = meta["rows"]
+        self._local -= self._keys
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(worksheet_name=WORKSHEET_NAME):
+    """Return the process-shared duplicate index for a worksheet"""
+    with _indexes_lock:
+        if worksheet_name not in _indexes:
+            _indexes[worksheet_name] = DuplicateIndex(worksheet_name)
+        return _indexes[worksheet_name]
@@ -0,0 +1,174 @@
+import os
+import csv
+import sys
+import json
+import argparse
+import numpy as np
+from connect import with_worksheet
+from schema import CLASS_LEVELS, PUPIL_FIELDS
+from snapshot import column_letter
+
+
+# Rows fetched per A1 range request
+PAGE_SIZE = 1000
+
+DERIVED_HEADERS = tuple(f"{level} Total Pupils" for level in CLASS_LEVELS) + ("Total Enrollment",)
+
+
+def iter_pages(worksheet_name, page_size=PAGE_SIZE, start_row=2):
+    """Yield (headers, first_row, rows) pages of a worksheet, reading fixed-size A1 ranges"""
+    headers = with_worksheet(lambda worksheet: worksheet.row_values(1), worksheet_name, missing=[])
+    if not headers:
+        return
+    last_column = column_letter(len(headers))
+    first_row = start_row
+    while True:
+        end_row = first_row + page_size - 1
+        rows = with_worksheet(
+            lambda worksheet: worksheet.get(f"A{first_row}:{last_column}{end_row}"), worksheet_name
+        )
+        if not rows:
+            return
+        # Pad rows whose trailing cells were empty so columns line up
+        yield headers, first_row, [row + [""] * (len(headers) - len(row)) for row in rows]
+        if len(rows) < page_size:
+            return
+        first_row = end_row + 1
+
+
+def derived_columns(headers, rows):
+    """Total pupils per class level and total enrollment for one page, computed column-wise"""
+    positions = [
+        [headers.index(f"{level} {field}") if f"{level} {field}" in headers else None
+         for field in PUPIL_FIELDS[:2]]
+        for level in CLASS_LEVELS
+    ]
+    totals = np.zeros((len(rows), len(CLASS_LEVELS)), dtype=np.int64)
+    for level, (males, females) in enumerate(positions):
+        for position in (males, females):
+            if position is None:
+                continue
+            column = np.array([row[position] for row in rows], dtype=object)
+            numbers = np.array([str(value).replace(",", "") for value in column])
+            valid = np.char.isdigit(numbers)
+            totals[valid, level] += numbers[valid].astype(np.int64)
+    return np.column_stack([totals, totals.sum(axis=1)]).tolist()
+
+
+class CsvSink:
+    def __init__(self, path, append=False):
+        self.file = open(path, "a" if append else "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.needs_header = not append
+
+    def write_header(self, headers):
+        if self.needs_header:
+            self.writer.writerow(headers)
+            self.needs_header = False
+
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class XlsxSink:
+    """openpyxl write-only workbook: rows are streamed to disk, not held in memory"""
+
+    def __init__(self, path):
+        from openpyxl import Workbook
+        self.path = path
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet("Submissions")
+        self.needs_header = True
+
+    def write_header(self, headers):
+        if self.needs_header:
+            self.sheet.append(headers)
+            self.needs_header = False
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.sheet.append(row)
+
+    def close(self):
+        self.workbook.save(self.path)
+
+
+def export(worksheets, sink, derived=False, page_size=PAGE_SIZE, progress=None, resume=None):
+    """Stream every row of `worksheets` into `sink`, one page at a time.
+
+    `progress(state)` is called after each page with the resume state
+    {"done": [...], "worksheet": name, "next_row": n}; passing that state back
+    as `resume` continues where the export stopped.
+    """
+    state = {"done": list((resume or {}).get("done", [])), "worksheet": None, "next_row": 2}
+    written = 0
+    for worksheet_name in worksheets:
+        if worksheet_name in state["done"]:
+            continue
+        start_row = 2
+        if resume and resume.get("worksheet") == worksheet_name:
+            start_row = resume["next_row"]
+        for headers, first_row, rows in iter_pages(worksheet_name, page_size, start_row):
+            sink.write_header(list(headers) + list(DERIVED_HEADERS if derived else ()))
+            if derived:
+                rows = [row + extra for row, extra in zip(rows, derived_columns(headers, rows))]
+            sink.write_rows(rows)
+            written += len(rows)
+            state.update(worksheet=worksheet_name, next_row=first_row + len(rows))
+            if progress:
+                progress(dict(state))
+        state["done"].append(worksheet_name)
+        state.update(worksheet=None, next_row=2)
+        if progress:
+            progress(dict(state))
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export all submissions to CSV or XLSX with bounded memory")
+    parser.add_argument("output", help="Output file (.csv or .xlsx)")
+    parser.add_argument("--worksheet", action="append",
+                        help="Worksheet to export (repeatable; default: the legacy sheet and every shard)")
+    parser.add_argument("--derived", action="store_true",
+                        help="Add total pupils per class level and total enrollment columns")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="Rows per range request")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted CSV export from <output>.progress")
+    args = parser.parse_args()
+
+    xlsx = args.output.lower().endswith(".xlsx")
+    progress_path = args.output + ".progress"
+    resume = None
+    if args.resume:
+        if xlsx:
+            sys.exit("Error: --resume is only supported for CSV output")
+        with open(progress_path) as f:
+            resume = json.load(f)
+
+    if args.worksheet:
+        worksheets = args.worksheet
+    else:
+        import shards
+        worksheets = shards.list_shards()
+
+    def save_progress(state):
+        with open(progress_path + ".tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(progress_path + ".tmp", progress_path)
+        print(f"{state['worksheet'] or 'finished'}: next row {state['next_row']}", file=sys.stderr)
+
+    sink = XlsxSink(args.output) if xlsx else CsvSink(args.output, append=resume is not None)
+    try:
+        written = export(worksheets, sink, args.derived, args.page_size, save_progress, resume)
+    finally:
+        sink.close()
+    os.remove(progress_path)
+    print(f"Exported {written} rows to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
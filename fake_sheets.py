@@ -0,0 +1,140 @@
+import re
+import time
+import random
+import threading
+import connect
+
+
+_A1_RANGE = re.compile(r"^([A-Z]*)(\d*)(?::([A-Z]*)(\d*))?$")
+
+
+def _column_number(letters):
+    number = 0
+    for letter in letters:
+        number = number * 26 + ord(letter) - ord("A") + 1
+    return number
+
+
+def _parse_range(a1):
+    """Turn 'A5:AV', 'A2:C10' or '3:4' into 0-based (row_start, row_stop, col_start, col_stop)"""
+    match = _A1_RANGE.match(a1.split("!")[-1])
+    if not match:
+        raise ValueError(f"Unsupported range: {a1}")
+    start_col, start_row, end_col, end_row = match.groups()
+    return (
+        int(start_row) - 1 if start_row else 0,
+        int(end_row) if end_row else None,
+        _column_number(start_col) - 1 if start_col else 0,
+        _column_number(end_col) if end_col else None,
+    )
+
+
+class FakeWorksheet:
+    """In-memory stand-in for gspread.Worksheet with a configurable per-call latency"""
+
+    def __init__(self, title="DL", rows=None, latency=0.0):
+        self.title = title
+        self.latency = latency
+        self.rows = [list(row) for row in rows or []]
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def _request(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def row_values(self, row):
+        self._request("row_values")
+        with self._lock:
+            return [str(value) for value in self.rows[row - 1]] if row <= len(self.rows) else []
+
+    def get(self, range_name=None):
+        self._request("get")
+        with self._lock:
+            if range_name is None:
+                return [[str(value) for value in row] for row in self.rows]
+            row_start, row_stop, col_start, col_stop = _parse_range(range_name)
+            return [[str(value) for value in row[col_start:col_stop]] for row in self.rows[row_start:row_stop]]
+
+    def get_all_values(self):
+        self._request("get_all_values")
+        with self._lock:
+            return [[str(value) for value in row] for row in self.rows]
+
+    def get_all_records(self):
+        self._request("get_all_records")
+        with self._lock:
+            if not self.rows:
+                return []
+            header = self.rows[0]
+            return [dict(zip(header, row)) for row in self.rows[1:]]
+
+    def append_row(self, values, **kwargs):
+        self._request("append_row")
+        with self._lock:
+            self.rows.append(list(values))
+
+    def append_rows(self, values, **kwargs):
+        self._request("append_rows")
+        with self._lock:
+            self.rows.extend(list(row) for row in values)
+
+
+class FakeSpreadsheet:
+    def __init__(self, worksheets, latency=0.0):
+        self.latency = latency
+        self._worksheets = {worksheet.title: worksheet for worksheet in worksheets}
+
+    def worksheet(self, title):
+        if title not in self._worksheets:
+            from gspread.exceptions import WorksheetNotFound
+            raise WorksheetNotFound(title)
+        return self._worksheets[title]
+
+    def worksheets(self):
+        return list(self._worksheets.values())
+
+    def add_worksheet(self, title, rows=1000, cols=26, index=None):
+        self._worksheets[title] = FakeWorksheet(title, latency=self.latency)
+        return self._worksheets[title]
+
+
+class FakeClient:
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+
+    def open(self, title):
+        return self.spreadsheet
+
+    def set_timeout(self, timeout):
+        pass
+
+
+def make_rows(headers, count, zone_triples, seed=0):
+    """Generate `count` plausible school rows in the given column order"""
+    rng = random.Random(seed)
+    rows = [list(headers)]
+    for n in range(count):
+        zone, region, division = zone_triples[n % len(zone_triples)]
+        values = {
+            "Timestamp": "2025-01-01 08:00:00",
+            "Zone": zone,
+            "Region": region,
+            "Division": division,
+            "School Name": f"School {n}",
+            "Head Teacher": f"Teacher {n}",
+            "Phone": f"02{n:08d}",
+            "WhatsApp": f"05{n:08d}",
+        }
+        rows.append([values.get(column, rng.randint(1, 50)) for column in headers])
+    return rows
+
+
+def install(rows=None, latency=0.0, title=connect.WORKSHEET_NAME):
+    """Point connect's pooled client at a fake spreadsheet and return its main worksheet"""
+    worksheet = FakeWorksheet(title, rows, latency)
+    client = FakeClient(FakeSpreadsheet([worksheet], latency))
+    connect.cred = lambda: client
+    connect.reconnect()
+    return worksheet
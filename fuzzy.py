@@ -0,0 +1,156 @@
+import re
+import difflib
+import threading
+from collections import Counter
+import shards
+from snapshot import get_snapshot
+
+
+# Combined similarity at or above which a school is reported as a likely repeat
+THRESHOLD = 0.8
+# Candidates (by shared blocking keys) that get a full similarity score
+MAX_CANDIDATES = 50
+MAX_RESULTS = 5
+
+# Words that carry no identity in school or person names
+STOPWORDS = frozenset({
+    "the", "of", "and", "school", "schools", "sch", "basic", "primary", "academy", "complex",
+    "international", "intl", "preparatory", "prep", "montessori", "deeper", "life", "dl",
+    "mr", "mrs", "miss", "ms", "dr", "rev", "pastor", "madam",
+})
+
+_SOUNDEX = str.maketrans("bfpvcgjkqsxzdtlmnr", "111122222222334556")
+
+
+def normalize(text):
+    """Lower-case alphanumeric tokens without stopwords"""
+    tokens = re.sub(r"[^0-9a-z]+", " ", str(text).casefold()).split()
+    return " ".join(token for token in tokens if token not in STOPWORDS)
+
+
+def soundex(word):
+    """Four-character Soundex code of a word"""
+    if not word:
+        return ""
+    digits = word.translate(_SOUNDEX)
+    code = word[0]
+    previous = digits[0]
+    for letter, digit in zip(word[1:], digits[1:]):
+        if digit.isdigit() and digit != previous:
+            code += digit
+        if letter not in "hw":
+            previous = digit
+    return (code + "000")[:4]
+
+
+def block_keys(name, teacher):
+    """Blocking keys: character trigrams of the school name plus phonetic codes of the teacher's names"""
+    padded = f" {name} "
+    keys = {"n:" + padded[i:i + 3] for i in range(len(padded) - 2)}
+    for token in teacher.split():
+        keys.add("t:" + soundex(token))
+    return keys
+
+
+def _entry(school_name, head_teacher, region, division):
+    """(school name, head teacher, normalized name, normalized teacher, region, division)"""
+    return (str(school_name), str(head_teacher), normalize(school_name), normalize(head_teacher),
+            str(region), str(division))
+
+
+def similarity(a, b):
+    return difflib.SequenceMatcher(None, a, b).ratio() if a and b else 0.0
+
+
+class FuzzyIndex:
+    """Blocking index of (school name, head teacher) per region/division for one worksheet.
+
+    Candidates are the entries in the same division that share the most
+    blocking keys with the query, so only a handful get a full string comparison.
+    Like DuplicateIndex, it consumes the worksheet's snapshot incrementally.
+    """
+
+    def __init__(self, worksheet_name):
+        self.snapshot = get_snapshot(worksheet_name)
+        self._entries = []  # see _entry
+        self._postings = {}  # (region, division, key) -> entry ids
+        # Our own submissions, kept across reconciles until the snapshot has them (see DuplicateIndex._local)
+        self._local = {}  # (normalized name, normalized teacher, region, division) -> entry
+        self._rows = 0
+        self._generation = None
+        self._lock = threading.Lock()
+
+    def _add(self, entry):
+        entry_id = len(self._entries)
+        self._entries.append(entry)
+        self._local.pop(entry[2:], None)
+        for key in block_keys(entry[2], entry[3]):
+            self._postings.setdefault((entry[4], entry[5], key), []).append(entry_id)
+
+    def add(self, record):
+        """Index one of our own submissions before the sheet has it"""
+        entry = _entry(record["School Name"], record["Head Teacher"], record["Region"], record["Division"])
+        with self._lock:
+            self._local[entry[2:]] = entry
+
+    def update(self):
+        """Index snapshot rows added since the last update (no network I/O)"""
+        with self._lock:
+            meta, columns = self.snapshot.read()
+            if meta["generation"] != self._generation:
+                self._entries, self._postings, self._rows = [], {}, 0
+                self._generation = meta["generation"]
+            if meta["rows"] <= self._rows or "School Name" not in columns:
+                return
+            new = slice(self._rows, meta["rows"])
+            for values in zip(*(columns[c][new] for c in ("School Name", "Head Teacher", "Region", "Division"))):
+                self._add(_entry(*values))
+            self._rows = meta["rows"]
+
+    def search(self, school_name, head_teacher, region, division, threshold=THRESHOLD):
+        """Entries in the division whose name and head teacher together score >= threshold"""
+        name, teacher = normalize(school_name), normalize(head_teacher)
+        with self._lock:
+            counts = Counter()
+            for key in block_keys(name, teacher):
+                counts.update(self._postings.get((region, division, key), ()))
+            entries = [self._entries[entry_id] for entry_id, _ in counts.most_common(MAX_CANDIDATES)]
+            entries += [entry for entry in self._local.values() if entry[4:] == (region, division)]
+
+        matches = []
+        for original_name, original_teacher, other_name, other_teacher, _, _ in entries:
+            name_score = similarity(name, other_name)
+            teacher_score = similarity(teacher, other_teacher)
+            score = (name_score + teacher_score) / 2
+            if score >= threshold:
+                matches.append({
+                    "School Name": original_name,
+                    "Head Teacher": original_teacher,
+                    "Name Match": round(name_score, 2),
+                    "Head Teacher Match": round(teacher_score, 2),
+                    "Score": round(score, 2),
+                })
+        return matches
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_fuzzy_index(worksheet_name):
+    """Return the process-shared fuzzy index for a worksheet"""
+    with _indexes_lock:
+        if worksheet_name not in _indexes:
+            _indexes[worksheet_name] = FuzzyIndex(worksheet_name)
+        return _indexes[worksheet_name]
+
+
+def find_similar(school_name, head_teacher, zone, region, division, year=None):
+    """Near-duplicate schools in the division, best first, from the zone's shard and the legacy sheet"""
+    matches = []
+    for worksheet_name in (shards.shard_name(zone, year), shards.LEGACY_WORKSHEET):
+        index = get_fuzzy_index(worksheet_name)
+        index.update()
+        matches.extend(index.search(school_name, head_teacher, region, division))
+    matches.sort(key=lambda match: match["Score"], reverse=True)
+    return matches[:MAX_RESULTS]
@@ -0,0 +1,149 @@
+import time
+import threading
+import sharedcache
+from scheduler import QuotaWaitTimeout
+
+
+UP = "up"
+DOWN = "down"
+UNKNOWN = "unknown"
+
+# Seconds between background probes of the spreadsheet
+PROBE_INTERVAL = 30
+# A probe result older than this is no longer trusted (seconds)
+STATUS_TTL = 90
+# Consecutive failures that open the circuit
+FAILURE_THRESHOLD = 3
+# Seconds the circuit stays open before one trial call is let through
+RESET_TIMEOUT = 30
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Sheets while the circuit is open"""
+
+
+class CircuitBreaker:
+    """Fail fast after repeated Sheets failures, retrying one call after a cool-down"""
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT, excluded=()):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        # Exceptions that say nothing about Sheets' health (e.g. our own quota queue timing out)
+        self.excluded = excluded
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self._opened_at is not None
+
+    def _before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if self._trial_in_flight or time.monotonic() - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError("Google Sheets is unreachable; try again shortly")
+            # Half-open: let a single trial call through
+            self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def call(self, fn, *args, **kwargs):
+        self._before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except self.excluded:
+            with self._lock:
+                self._trial_in_flight = False
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+
+# Shared by every Sheets call in the process (see connect.with_worksheet)
+breaker = CircuitBreaker(excluded=(QuotaWaitTimeout,))
+
+
+class HealthMonitor:
+    """Probe the spreadsheet in the background and cache the result"""
+
+    def __init__(self, interval=PROBE_INTERVAL, ttl=STATUS_TTL):
+        self.interval = interval
+        self.ttl = ttl
+        self._state = UNKNOWN
+        self._checked_at = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def probe(self):
+        from connect import with_worksheet
+        from scheduler import PRIORITY_PROBE
+        # Only the refresher process probes; the others read its published result
+        if not sharedcache.acquire(sharedcache.REFRESHER):
+            shared = sharedcache.get("health", max_age=self.ttl)
+            if shared is not None:
+                with self._lock:
+                    self._state = shared[0]
+                    self._checked_at = time.monotonic() - (time.time() - shared[2])
+                return shared[0]
+        try:
+            # Lowest priority: probes never hold up real reads and writes for quota
+            with_worksheet(lambda worksheet: worksheet.row_values(1), key="probe", priority=PRIORITY_PROBE)
+            state = UP
+        except Exception:
+            state = DOWN
+        with self._lock:
+            self._state = state
+            self._checked_at = time.monotonic()
+        sharedcache.put("health", state)
+        return state
+
+    def status(self):
+        """Cached connectivity state; never touches the network"""
+        if breaker.is_open:
+            return DOWN
+        with self._lock:
+            if self._checked_at is None or time.monotonic() - self._checked_at > self.ttl:
+                return UNKNOWN
+            return self._state
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="sheets-health", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self.probe()
+            time.sleep(self.interval)
+
+
+monitor = HealthMonitor()
+
+
+def status():
+    return monitor.status()
+
+
+def start():
+    """Start the background health monitor (idempotent)"""
+    monitor.start()
@@ -0,0 +1,38 @@
+import sys
+import argparse
+import subprocess
+
+
+def profile(module):
+    """Import a module in a fresh interpreter under -X importtime and return (cumulative_us, name) pairs"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings.append((int(cumulative), name.strip()))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproducible import-time profile of the app modules")
+    parser.add_argument("module", nargs="?", default="data", help="Module to import (default: data)")
+    parser.add_argument("--top", type=int, default=20, help="Number of slowest imports to list")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to average over")
+    args = parser.parse_args()
+
+    runs = [dict((name, cumulative) for cumulative, name in profile(args.module)) for _ in range(args.runs)]
+    names = set().union(*runs)
+    average = {name: sum(run.get(name, 0) for run in runs) / len(runs) for name in names}
+
+    print(f"{args.module}: {average.get(args.module, 0) / 1000:.1f} ms cumulative (mean of {args.runs} runs)")
+    for name, cumulative in sorted(average.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{cumulative / 1000:10.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Threads working on submissions
+MAX_WORKERS = 4
+# Submissions accepted but not yet finished, across all sessions
+MAX_QUEUED = 64
+# Seconds a finished job's result is kept for its session to read
+JOB_TTL = 3600
+
+
+class JobQueueFull(Exception):
+    """Raised when MAX_QUEUED submissions are already waiting"""
+
+
+class Job:
+    def __init__(self, future):
+        self.id = uuid.uuid4().hex
+        self.created = time.time()
+        self.future = future
+
+    @property
+    def done(self):
+        return self.future.done()
+
+    @property
+    def result(self):
+        """(ok, message) once the job is done"""
+        try:
+            return self.future.result()
+        except Exception as e:
+            return False, f"Submission failed: {str(e)}"
+
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="submission")
+_slots = threading.BoundedSemaphore(MAX_QUEUED)
+_jobs = {}
+_lock = threading.Lock()
+
+
+def submit(fn, *args):
+    """Run fn(*args) on the bounded executor and return the new job's ID"""
+    if not _slots.acquire(blocking=False):
+        raise JobQueueFull("Too many submissions in progress")
+    try:
+        future = _executor.submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+
+    job = Job(future)
+    with _lock:
+        expired = [job_id for job_id, old in _jobs.items() if old.done and time.time() - old.created > JOB_TTL]
+        for job_id in expired:
+            del _jobs[job_id]
+        _jobs[job.id] = job
+    return job.id
+
+
+def get(job_id):
+    """Return the Job for an ID, or None if unknown or expired"""
+    if not job_id:
+        return None
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def is_active(job_id):
+    job = get(job_id)
+    return job is not None and not job.done
@@ -0,0 +1,431 @@
+import os
+import gc
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import tempfile
+import threading
+import statistics
+import tracemalloc
+import contextlib
+from urllib.parse import urlsplit, unquote, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import connect
+import fake_sheets
+import outbox
+import sharedcache
+import snapshot
+import metrics
+from schema import CLASS_LEVELS, HEADERS
+from zones import load_zone_index
+
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+SPREADSHEET_ID = "dl-schools-loadtest"
+# How long a simulated user waits for its background submission to finish (seconds)
+SUBMIT_TIMEOUT = 120
+# Pause between status polls, roughly what the page's run_every fragment does
+POLL_INTERVAL = 0.25
+
+
+class SheetsStandIn(ThreadingHTTPServer):
+    """Local HTTP server speaking the subset of the Sheets and Drive APIs that gspread uses here.
+
+    Worksheets live in fake_sheets objects; every request waits `latency`
+    seconds and a fraction `error_rate` of them fail with a quota 429.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, rows=None, latency=0.0, error_rate=0.0, seed=0):
+        super().__init__(("127.0.0.1", 0), _StandInHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.spreadsheet = fake_sheets.FakeSpreadsheet(
+            [fake_sheets.FakeWorksheet(connect.WORKSHEET_NAME, rows)]
+        )
+        self.calls = {}
+        self.throttled = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def total_calls(self):
+        with self._lock:
+            return sum(self.calls.values())
+
+    def record(self, endpoint):
+        """Count a request and decide whether to throttle it"""
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            throttle = self._random.random() < self.error_rate
+            self.throttled += throttle
+        return throttle
+
+    def sheet_metadata(self):
+        sheets = []
+        for index, worksheet in enumerate(self.spreadsheet.worksheets()):
+            sheets.append({"properties": {
+                "sheetId": index,
+                "title": worksheet.title,
+                "index": index,
+                "sheetType": "GRID",
+                "gridProperties": {"rowCount": max(1000, len(worksheet.rows)), "columnCount": len(HEADERS)},
+            }})
+        return {
+            "spreadsheetId": SPREADSHEET_ID,
+            "properties": {"title": connect.SPREADSHEET_NAME, "locale": "en_US"},
+            "sheets": sheets,
+        }
+
+
+def _split_range(label):
+    """Turn "'DL'!A5:AV" into ("DL", "A5:AV"); a bare sheet name selects everything"""
+    title, _, a1 = label.partition("!")
+    if title.startswith("'") and title.endswith("'"):
+        title = title[1:-1].replace("''", "'")
+    return title, a1 or None
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        parts = urlsplit(self.path)
+        path = unquote(parts.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else {}
+
+        if path.startswith("/drive/v3/files"):
+            endpoint = "drive.files.list"
+        elif ":batchUpdate" in path:
+            endpoint = "spreadsheets.batchUpdate"
+        elif "/values/" in path:
+            endpoint = "values.append" if path.endswith(":append") else "values.get"
+        else:
+            endpoint = "spreadsheets.get"
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.record(endpoint):
+            return self._reply(429, {"error": {
+                "code": 429, "status": "RESOURCE_EXHAUSTED",
+                "message": "Quota exceeded for quota metric 'Read requests'",
+            }})
+
+        try:
+            handler = getattr(self, "_" + endpoint.replace(".", "_"))
+            self._reply(200, handler(path, parse_qs(parts.query), body))
+        except KeyError as e:
+            self._reply(400, {"error": {"code": 400, "status": "INVALID_ARGUMENT", "message": str(e)}})
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _drive_files_list(self, path, query, body):
+        return {"files": [{
+            "id": SPREADSHEET_ID,
+            "name": connect.SPREADSHEET_NAME,
+            "createdTime": "2025-01-01T00:00:00.000Z",
+            "modifiedTime": "2025-01-01T00:00:00.000Z",
+        }]}
+
+    def _spreadsheets_get(self, path, query, body):
+        return self.server.sheet_metadata()
+
+    def _spreadsheets_batchUpdate(self, path, query, body):
+        replies = []
+        for request in body.get("requests", []):
+            title = request["addSheet"]["properties"]["title"]
+            self.server.spreadsheet.add_worksheet(title)
+            sheets = self.server.sheet_metadata()["sheets"]
+            replies.append({"addSheet": {"properties": sheets[-1]["properties"]}})
+        return {"spreadsheetId": SPREADSHEET_ID, "replies": replies}
+
+    def _values_get(self, path, query, body):
+        label = path.split("/values/", 1)[1]
+        title, a1 = _split_range(label)
+        values = self.server.spreadsheet.worksheet(title).get(a1)
+        return {"range": label, "majorDimension": "ROWS", "values": values}
+
+    def _values_append(self, path, query, body):
+        label = path.split("/values/", 1)[1][:-len(":append")]
+        title, _ = _split_range(label)
+        rows = body.get("values", [])
+        self.server.spreadsheet.worksheet(title).append_rows(rows)
+        return {"spreadsheetId": SPREADSHEET_ID, "updates": {"updatedRange": label, "updatedRows": len(rows)}}
+
+
+def client_factory(base_url):
+    """Return a `connect.cred` replacement: a real gspread client whose requests go to `base_url`"""
+    import gspread
+    import requests
+
+    class LocalSession(requests.Session):
+        def request(self, method, url, *args, **kwargs):
+            for prefix in ("https://sheets.googleapis.com", "https://www.googleapis.com"):
+                if url.startswith(prefix):
+                    url = base_url + url[len(prefix):]
+            return super().request(method, url, *args, **kwargs)
+
+    return lambda: gspread.Client(auth=None, session=LocalSession())
+
+
+@contextlib.contextmanager
+def shared_runtime():
+    """Let AppTest sessions run side by side in one process.
+
+    Every AppTest run installs its own mock Runtime and config patch and
+    removes them when it finishes, which pulls them out from under any run
+    still in flight. Keep the last runtime visible and pin the app-test
+    config for the whole load test instead.
+    """
+    from unittest.mock import patch
+    from streamlit.runtime.runtime import Runtime
+    from streamlit.testing.v1.util import patch_config_options
+    pinned = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            pinned[:] = [cls._instance]
+        if not pinned:
+            raise RuntimeError("Runtime hasn't been created!")
+        return pinned[0]
+
+    def exists(cls):
+        return cls._instance is not None or bool(pinned)
+
+    with patch_config_options({"global.appTest": True}), \
+            patch.object(Runtime, "instance", classmethod(instance)), \
+            patch.object(Runtime, "exists", classmethod(exists)):
+        yield
+
+
+class SimulatedUser:
+    """One head teacher walking all three pages of app.py in its own AppTest session"""
+
+    def __init__(self, name, triple, timeout):
+        from streamlit.testing.v1 import AppTest
+        self.name = name
+        self.triple = triple
+        self.app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.timings = []
+        self.ok = None
+
+    def _run(self):
+        start = time.perf_counter()
+        self.app.run()
+        self.timings.append((time.perf_counter() - start) * 1000)
+        if self.app.exception:
+            raise RuntimeError(self.app.exception[0].message)
+
+    def _click(self, label):
+        next(button for button in self.app.button if button.label == label).click()
+        self._run()
+
+    def submit(self, serial):
+        """Fill in and submit one survey; returns True if the app reported success"""
+        zone, region, division = self.triple
+        app = self.app
+        self._run()
+        app.selectbox(key="zone_select").select(zone)
+        self._run()
+        app.selectbox(key="region_select").select(region)
+        self._run()
+        app.selectbox(key="division_select").select(division)
+        self._run()
+        app.text_input[0].input(f"Load Test School {serial}")
+        app.text_input[1].input(f"Head Teacher {serial}")
+        app.text_input[2].input(f"02{serial:08d}")
+        app.text_input[3].input(f"05{serial:08d}")
+        self._run()
+        self._click("Next")
+
+        for level in CLASS_LEVELS:
+            app.number_input(key=f"{level}_males").set_value(10)
+            app.number_input(key=f"{level}_females").set_value(12)
+            app.number_input(key=f"{level}_tuition").set_value(150)
+        self._run()
+        self._click("Next")
+
+        for key in ("admission_fees", "canteen_fees", "stationary_fees",
+                    "head_salary", "lowest_salary", "highest_salary"):
+            app.number_input(key=key).set_value(100)
+        for key in ("teaching_staff_count", "non_teaching_staff_count", "committee_members_count"):
+            app.number_input(key=key).set_value(5)
+        self._run()
+        self._click("Submit Data")
+
+        deadline = time.monotonic() + SUBMIT_TIMEOUT
+        while time.monotonic() < deadline:
+            if app.success or app.error:
+                break
+            time.sleep(POLL_INTERVAL)
+            self._run()
+        self.ok = bool(app.success) and not app.error
+        return self.ok
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def run_stage(server, users, rounds, triples, stage, timeout, trace_memory):
+    """Drive `users` concurrent sessions through `rounds` submissions each and summarise"""
+    gc.collect()
+    baseline_memory = tracemalloc.get_traced_memory()[0] if trace_memory else 0
+    calls_before = server.total_calls()
+    throttled_before = server.throttled
+    sessions = [
+        SimulatedUser(f"user-{n}", triples[n % len(triples)], timeout) for n in range(users)
+    ]
+    errors = []
+
+    def drive(n, session):
+        for round_ in range(rounds):
+            # stage/user/round packed into an 8-digit serial keeps phones and names unique
+            serial = stage * 1_000_000 + n * 1_000 + round_
+            try:
+                session.submit(serial)
+            except Exception as e:
+                errors.append(f"{session.name}: {e}")
+                return
+            if round_ + 1 < rounds:
+                session.app = type(session.app).from_file(APP_PATH, default_timeout=timeout)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=drive, args=(n, session)) for n, session in enumerate(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    # Count what the queued rows cost to deliver, not just the page views
+    while outbox.pending_count():
+        outbox.flush()
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0] - baseline_memory if trace_memory else None
+
+    timings = sorted(t for session in sessions for t in session.timings)
+    completed = sum(1 for session in sessions if session.ok)
+    calls = server.total_calls() - calls_before
+    return {
+        "users": users,
+        "rounds": rounds,
+        "completed": completed,
+        "failed": users * rounds - completed,
+        "errors": errors[:10],
+        "elapsed_s": elapsed,
+        "submissions_per_s": completed / elapsed if elapsed else 0.0,
+        "reruns": len(timings),
+        "reruns_per_s": len(timings) / elapsed if elapsed else 0.0,
+        "rerun_mean_ms": statistics.fmean(timings) if timings else 0.0,
+        "rerun_p50_ms": _percentile(timings, 0.50),
+        "rerun_p95_ms": _percentile(timings, 0.95),
+        "rerun_p99_ms": _percentile(timings, 0.99),
+        "memory_per_session_kb": memory / users / 1024 if memory is not None else None,
+        "api_calls": calls,
+        "api_calls_throttled": server.throttled - throttled_before,
+        "api_calls_per_submission": calls / completed if completed else None,
+    }
+
+
+def _print_result(result):
+    memory = result["memory_per_session_kb"]
+    per_submission = result["api_calls_per_submission"]
+    print(f"{result['users']:>4} users  {result['completed']:>4} ok {result['failed']:>3} failed  "
+          f"{result['submissions_per_s']:6.2f} sub/s  {result['reruns_per_s']:7.1f} reruns/s  "
+          f"p95 {result['rerun_p95_ms']:8.1f} ms  p99 {result['rerun_p99_ms']:8.1f} ms  "
+          f"mem/session {'-' if memory is None else f'{memory:8.0f} KB'}  "
+          f"calls/sub {'-' if per_submission is None else f'{per_submission:5.1f}'}", flush=True)
+    for error in result["errors"]:
+        print(f"  {error}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Concurrent-session load test of app.py against a local Sheets API stand-in")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 5, 10, 20],
+                        help="Concurrency levels to ramp through")
+    parser.add_argument("--rounds", type=int, default=1, help="Submissions per simulated user per stage")
+    parser.add_argument("--rows", type=int, default=1000, help="Existing rows in the legacy worksheet")
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds the stand-in waits per request")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of requests answered with 429 Too Many Requests")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-rerun AppTest timeout (seconds)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip tracemalloc (it slows every rerun down noticeably)")
+    parser.add_argument("--output", default="loadtest_results.json", help="JSON file for the results")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="dl-loadtest-")
+    outbox.OUTBOX_PATH = os.path.join(workdir, "outbox.db")
+    snapshot.SNAPSHOT_DIR = os.path.join(workdir, "snapshot")
+    sharedcache.SHARED_CACHE_PATH = os.path.join(workdir, "shared.db")
+
+    zone_index = load_zone_index()
+    triples = sorted(zone_index.triples)
+    server = SheetsStandIn(fake_sheets.make_rows(HEADERS, args.rows, triples), args.latency, args.error_rate)
+    threading.Thread(target=server.serve_forever, name="sheets-stand-in", daemon=True).start()
+    connect.cred = client_factory(server.url)
+    connect.reconnect()
+
+    trace_memory = not args.no_memory
+    if trace_memory:
+        tracemalloc.start()
+
+    results = []
+    with shared_runtime():
+        # One sequential page view first: pins the runtime and pays for first-import costs
+        SimulatedUser("warm-up", triples[0], args.timeout)._run()
+        # Bare-mode streamlit warns whenever a non-script thread touches st; loading the
+        # config during the first run resets logger levels, so silence it afterwards
+        logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+        for stage, users in enumerate(args.users, start=1):
+            results.append(run_stage(server, users, args.rounds, triples, stage, args.timeout, trace_memory))
+            _print_result(results[-1])
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "latency_s": args.latency,
+            "error_rate": args.error_rate,
+            "rows": args.rows,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "api_calls_by_endpoint": server.calls,
+        # In-process span timings across all stages (script time without AppTest overhead)
+        "spans": metrics.snapshot()["spans"],
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
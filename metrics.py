@@ -0,0 +1,222 @@
+import os
+import json
+import time
+import logging
+import threading
+import functools
+import contextlib
+from collections import deque
+
+
+METRICS_DIR = os.getenv("DL_METRICS_DIR", ".cache")
+# Recent durations kept per span for the quantiles
+RESERVOIR_SIZE = 2048
+# Seconds between snapshot exports
+EXPORT_INTERVAL = 15
+
+# Worksheet methods that count against the write quota
+WRITE_METHODS = {"append_row", "append_rows", "update", "batch_update", "insert_row", "insert_rows", "clear", "resize"}
+
+# Where span log lines go: unset disables them, "stderr" for the console, else a file path
+TRACE_LOG = os.getenv("DL_TRACE_LOG")
+
+logger = logging.getLogger("dl_schools.trace")
+
+_lock = threading.Lock()
+_counters = {}  # (name, labels) -> value
+_durations = {}  # span name -> recent durations in seconds
+_totals = {}  # span name -> [count, sum]
+_exporter = None
+
+
+def configure_logging(target=TRACE_LOG):
+    """Send one JSON line per span to `target` (see TRACE_LOG); None leaves logging off"""
+    if not target:
+        return
+    handler = logging.StreamHandler() if target == "stderr" else logging.FileHandler(target)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    # The lines are already structured; keep them out of Streamlit's own log format
+    logger.propagate = False
+
+
+configure_logging()
+
+
+def incr(name, value=1, **labels):
+    """Add to a counter, optionally labelled"""
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, seconds):
+    with _lock:
+        if name not in _durations:
+            _durations[name] = deque(maxlen=RESERVOIR_SIZE)
+            _totals[name] = [0, 0.0]
+        _durations[name].append(seconds)
+        _totals[name][0] += 1
+        _totals[name][1] += seconds
+
+
+@contextlib.contextmanager
+def span(name, **attrs):
+    """Time a block, record it under `name` and emit a structured log line"""
+    start = time.perf_counter()
+    error = None
+    try:
+        yield attrs
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        observe(name, seconds)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(
+                {"span": name, "ms": round(seconds * 1000, 3), "error": error, **attrs}, default=str
+            ))
+
+
+def traced(name):
+    """Decorator form of span()"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _size(result):
+    """Approximate (rows, bytes) of a Sheets response"""
+    if not isinstance(result, list):
+        return 0, 0
+    if result and isinstance(result[0], dict):
+        return len(result), sum(len(str(value)) for record in result for value in record.values())
+    if result and isinstance(result[0], list):
+        return len(result), sum(len(str(value)) for row in result for value in row)
+    return (1 if result else 0), sum(len(str(value)) for value in result)
+
+
+class InstrumentedWorksheet:
+    """Proxy around a worksheet that records a span and quota counters per API call"""
+
+    def __init__(self, worksheet):
+        self._worksheet = worksheet
+
+    def __getattr__(self, name):
+        attr = getattr(self._worksheet, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def call(*args, **kwargs):
+            kind = "write" if name in WRITE_METHODS else "read"
+            with span(f"sheets.{name}", worksheet=self._worksheet.title) as attrs:
+                result = attr(*args, **kwargs)
+                if kind == "read":
+                    rows, size = _size(result)
+                    incr("sheets_rows_fetched", rows, method=name)
+                    incr("sheets_bytes_fetched", size, method=name)
+                else:
+                    rows = len(args[0]) if name.endswith("_rows") and args else 1
+                    incr("sheets_rows_written", rows, method=name)
+                attrs["rows"] = rows
+            incr("sheets_requests", method=name, kind=kind)
+            return result
+        return call
+
+
+def _quantile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+
+def snapshot():
+    """Current counters and span latency summaries as a plain dict"""
+    with _lock:
+        counters = [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in sorted(_counters.items())
+        ]
+        spans = {}
+        for name, durations in _durations.items():
+            ordered = sorted(durations)
+            count, total = _totals[name]
+            spans[name] = {
+                "count": count,
+                "sum_s": total,
+                "p50_s": _quantile(ordered, 0.5),
+                "p95_s": _quantile(ordered, 0.95),
+                "p99_s": _quantile(ordered, 0.99),
+            }
+
+    submissions = sum(c["value"] for c in counters if c["name"] == "submissions")
+    requests = sum(c["value"] for c in counters if c["name"] == "sheets_requests")
+    return {
+        "created": time.time(),
+        "counters": counters,
+        "spans": spans,
+        "sheets_requests_per_submission": requests / submissions if submissions else None,
+    }
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in sorted(labels.items())) + "}"
+
+
+def prometheus_text(data=None):
+    """Render a snapshot in the Prometheus text exposition format"""
+    data = data or snapshot()
+    lines = []
+    seen = set()
+    for counter in data["counters"]:
+        metric = f"dl_{counter['name']}_total"
+        if metric not in seen:
+            lines.append(f"# TYPE {metric} counter")
+            seen.add(metric)
+        lines.append(f"{metric}{_labels(counter['labels'])} {counter['value']}")
+
+    if data["spans"]:
+        lines.append("# TYPE dl_span_seconds summary")
+    for name, summary in sorted(data["spans"].items()):
+        for quantile, field in (("0.5", "p50_s"), ("0.95", "p95_s"), ("0.99", "p99_s")):
+            lines.append(f'dl_span_seconds{_labels({"span": name, "quantile": quantile})} {summary[field]}')
+        lines.append(f'dl_span_seconds_count{_labels({"span": name})} {summary["count"]}')
+        lines.append(f'dl_span_seconds_sum{_labels({"span": name})} {summary["sum_s"]}')
+    return "\n".join(lines) + "\n"
+
+
+def export(directory=METRICS_DIR):
+    """Write metrics.json and metrics.prom atomically into `directory`"""
+    os.makedirs(directory, exist_ok=True)
+    data = snapshot()
+    for filename, content in (("metrics.json", json.dumps(data, indent=2)),
+                              ("metrics.prom", prometheus_text(data))):
+        path = os.path.join(directory, filename)
+        with open(path + ".tmp", "w") as f:
+            f.write(content)
+        os.replace(path + ".tmp", path)
+
+
+def _run_exporter():
+    while True:
+        time.sleep(EXPORT_INTERVAL)
+        try:
+            export()
+        except OSError:
+            pass
+
+
+def start_exporter():
+    """Periodically write the metrics snapshot to METRICS_DIR (idempotent)"""
+    global _exporter
+    with _lock:
+        if _exporter is None or not _exporter.is_alive():
+            _exporter = threading.Thread(target=_run_exporter, name="metrics-exporter", daemon=True)
+            _exporter.start()
@@ -0,0 +1,208 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import aggregates
+import sharedcache
+from connect import WORKSHEET_NAME, with_worksheet
+from scheduler import WRITE
+
+
+OUTBOX_PATH = os.getenv("DL_OUTBOX_PATH", os.path.join(".cache", "outbox.db"))
+
+# Rows appended per append_rows call
+BATCH_SIZE = 200
+# Seconds to let a burst of submissions accumulate before flushing
+BATCH_WINDOW = 2
+# Seconds between flush attempts when nothing wakes the worker
+FLUSH_INTERVAL = 30
+# Retry backoff bounds (seconds)
+BACKOFF_BASE = 2
+BACKOFF_MAX = 600
+# Sent rows are kept this long so repeated submissions still collapse (seconds)
+SENT_RETENTION = 7 * 24 * 3600
+# Only one process on the host drains the (shared) outbox at a time; the lease
+# outlives the slowest flush so a crashed flusher is replaced (seconds)
+FLUSH_LEASE = "outbox-flush"
+FLUSH_LEASE_TTL = 300
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    worksheet TEXT NOT NULL,
+    headers TEXT NOT NULL,
+    row TEXT NOT NULL,
+    created REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    sent REAL
+)
+"""
+
+_wakeup = threading.Event()
+_worker = None
+_worker_lock = threading.Lock()
+_flush_lock = threading.Lock()
+
+
+def _connect():
+    directory = os.path.dirname(OUTBOX_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(OUTBOX_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # Every committed submission is fsynced before we report success
+    conn.execute("PRAGMA synchronous=FULL")
+    conn.execute(_SCHEMA)
+    return conn
+
+
+def idempotency_key(record):
+    """Hash a flattened row, ignoring the timestamp, so re-submissions collapse"""
+    payload = json.dumps(
+        [[column, value] for column, value in record.items() if column != "Timestamp"],
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def enqueue(record, worksheet=WORKSHEET_NAME, key=None):
+    """Durably queue a flattened row for the sheet; returns False if already queued"""
+    return enqueue_many([(record, worksheet, key)])[0]
+
+
+def enqueue_many(items):
+    """Queue (record, worksheet, key) tuples in one transaction; returns an added flag per item"""
+    now = time.time()
+    added = []
+    conn = _connect()
+    try:
+        with conn:
+            for record, worksheet, key in items:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO outbox (idempotency_key, worksheet, headers, row, created) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key or idempotency_key(record), worksheet, json.dumps(list(record.keys())),
+                     json.dumps(list(record.values()), default=str), now)
+                )
+                added.append(cursor.rowcount == 1)
+    finally:
+        conn.close()
+    start_worker()
+    _wakeup.set()
+    return added
+
+
+def pending_count():
+    """Number of queued rows not yet written to the sheet"""
+    conn = _connect()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM outbox WHERE sent IS NULL").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def ensure_headers(worksheet, headers):
+    """Write the header row if the worksheet is empty (checked once per host)"""
+    name = f"headers:{worksheet.title}"
+    if sharedcache.get(name):
+        return
+    if not worksheet.row_values(1):
+        worksheet.append_row(headers)
+    sharedcache.put(name, True)
+
+
+def _append_batch(worksheet_name, headers, rows):
+    def write(worksheet):
+        ensure_headers(worksheet, headers)
+        worksheet.append_rows(rows)
+    with_worksheet(write, worksheet_name, kind=WRITE, create=True)
+
+
+def flush():
+    """Write due rows to the sheet in batches; returns the number of rows sent.
+
+    Returns None without sending anything while another process is flushing.
+    """
+    with _flush_lock:
+        if not sharedcache.acquire(FLUSH_LEASE, FLUSH_LEASE_TTL):
+            return None
+        try:
+            return _flush()
+        finally:
+            sharedcache.release(FLUSH_LEASE)
+
+
+def _flush():
+    conn = _connect()
+    try:
+        now = time.time()
+        due = conn.execute(
+            "SELECT id, worksheet, headers, row, attempts FROM outbox "
+            "WHERE sent IS NULL AND next_attempt <= ? ORDER BY id",
+            (now,)
+        ).fetchall()
+
+        # Group by target worksheet and header layout, then chunk
+        groups = {}
+        for row_id, worksheet_name, headers, row, attempts in due:
+            groups.setdefault((worksheet_name, headers), []).append((row_id, json.loads(row), attempts))
+
+        sent = 0
+        for (worksheet_name, headers), items in groups.items():
+            for start in range(0, len(items), BATCH_SIZE):
+                chunk = items[start:start + BATCH_SIZE]
+                ids = [(row_id,) for row_id, _, _ in chunk]
+                try:
+                    _append_batch(worksheet_name, json.loads(headers), [row for _, row, _ in chunk])
+                except Exception as e:
+                    with conn:
+                        conn.executemany(
+                            "UPDATE outbox SET attempts = ?, next_attempt = ?, last_error = ? WHERE id = ?",
+                            [(attempts + 1,
+                              now + min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempts),
+                              str(e), row_id)
+                             for row_id, _, attempts in chunk]
+                        )
+                    break
+                with conn:
+                    conn.executemany("UPDATE outbox SET sent = ?, last_error = NULL WHERE id = ?",
+                                     [(time.time(), row_id) for (row_id,) in ids])
+                sent += len(chunk)
+                try:
+                    aggregates.add_rows(json.loads(headers), [row for _, row, _ in chunk], worksheet_name)
+                except Exception:
+                    pass  # The rows are in the sheet; `aggregates.py --rebuild` catches the summary up
+
+        with conn:
+            conn.execute("DELETE FROM outbox WHERE sent IS NOT NULL AND sent < ?", (now - SENT_RETENTION,))
+        return sent
+    finally:
+        conn.close()
+
+
+def _run():
+    while True:
+        if _wakeup.wait(FLUSH_INTERVAL):
+            # Let concurrent submissions pile up so they share one API call
+            time.sleep(BATCH_WINDOW)
+        _wakeup.clear()
+        try:
+            if flush() is None:
+                # Another process holds the flush lease; look again shortly for our rows
+                _wakeup.set()
+        except Exception:
+            pass  # The rows stay queued; the next pass retries them
+
+
+def start_worker():
+    """Start the background thread that drains the outbox (idempotent)"""
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run, name="outbox-writer", daemon=True)
+            _worker.start()
@@ -0,0 +1,220 @@
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from schema import CLASS_LEVELS, FINANCIAL_COLUMNS, HEADERS, PUPIL_FIELDS
+from zones import load_zone_index
+
+
+REPORTS_DIR = os.getenv("DL_REPORTS_DIR", "reports")
+FORMATS = ("pdf", "png")
+# Bump when the figures change so every cached pack is re-rendered
+RENDER_VERSION = 1
+MANIFEST = "manifest.json"
+
+
+def slug(text):
+    """File-system safe name for a zone or region"""
+    return re.sub(r"[^0-9A-Za-z]+", "-", str(text)).strip("-").lower() or "unnamed"
+
+
+def zone_digest(rows, formats):
+    """Content hash of a zone's rows plus everything else that changes its output"""
+    digest = hashlib.sha256(f"{RENDER_VERSION}:{','.join(sorted(formats))}".encode())
+    columns = [column for column in HEADERS if column in rows.columns]
+    digest.update(pd.util.hash_pandas_object(rows[columns], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def load_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _pupils(rows, field):
+    """(schools x class levels) matrix of one pupil field, NaN where blank"""
+    columns = [f"{level} {field}" for level in CLASS_LEVELS]
+    return rows.reindex(columns=columns).to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _positive(values):
+    """Columns of a 2-D array as lists without blanks and zeros (not filled in)"""
+    return [column[(column > 0) & ~np.isnan(column)] for column in values.T]
+
+
+def _page(plt, title, rows, group_by):
+    """One 2x2 page: enrollment by level, gender split by group, tuition and fee/salary ranges"""
+    males, females, tuition = (_pupils(rows, field) for field in PUPIL_FIELDS)
+    males = np.nan_to_num(males)
+    females = np.nan_to_num(females)
+
+    figure, axes = plt.subplots(2, 2, figsize=(11.69, 8.27))
+    figure.suptitle(f"{title} — {len(rows)} schools", fontsize=14)
+
+    ax = axes[0, 0]
+    positions = np.arange(len(CLASS_LEVELS))
+    ax.bar(positions, males.sum(axis=0), label="Males")
+    ax.bar(positions, females.sum(axis=0), bottom=males.sum(axis=0), label="Females")
+    ax.set_xticks(positions, CLASS_LEVELS, rotation=45, ha="right", fontsize=8)
+    ax.set_title("Enrollment by class level")
+    # Headroom so the legend does not cover the bars
+    ax.set_ylim(top=max(1.0, (males + females).sum(axis=0).max()) * 1.2)
+    ax.legend(fontsize=8, ncols=2, loc="upper left")
+
+    ax = axes[0, 1]
+    groups = rows[group_by].astype(str).to_numpy()
+    labels = list(dict.fromkeys(groups))
+    codes = np.array([labels.index(group) for group in groups], dtype=int)
+    boys = np.bincount(codes, weights=males.sum(axis=1), minlength=len(labels))
+    girls = np.bincount(codes, weights=females.sum(axis=1), minlength=len(labels))
+    ax.barh(labels, boys, label="Males")
+    ax.barh(labels, girls, left=boys, label="Females")
+    for n, (b, g) in enumerate(zip(boys, girls)):
+        if b + g:
+            ax.text(b + g, n, f" {100 * g / (b + g):.0f}% F", va="center", fontsize=7)
+    ax.set_title(f"Gender split by {group_by.lower()}")
+    ax.tick_params(axis="y", labelsize=7)
+    ax.invert_yaxis()
+
+    ax = axes[1, 0]
+    ax.boxplot(_positive(tuition), showfliers=False)
+    ax.set_xticks(positions + 1, CLASS_LEVELS, rotation=45, ha="right", fontsize=8)
+    ax.set_title("Tuition fees by class level (GHS)")
+
+    ax = axes[1, 1]
+    financial = rows.reindex(columns=list(FINANCIAL_COLUMNS)).to_numpy(dtype=np.float64, na_value=np.nan)
+    ax.boxplot(_positive(financial), orientation="horizontal", showfliers=False)
+    ax.set_yticks(np.arange(len(FINANCIAL_COLUMNS)) + 1, FINANCIAL_COLUMNS, fontsize=8)
+    ax.set_title("Fee and salary ranges (GHS)")
+
+    figure.tight_layout()
+    return figure
+
+
+def render_zone(zone, regions, rows, directory, formats=FORMATS):
+    """Render one zone's pack: an overview page plus a page per region. Runs in a worker process."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    zone_dir = os.path.join(directory, slug(zone))
+    os.makedirs(zone_dir, exist_ok=True)
+    pages = [("overview", zone, rows, "Region")]
+    for region in regions:
+        region_rows = rows[rows["Region"] == region]
+        if len(region_rows):
+            pages.append((slug(region), f"{zone} / {region}", region_rows, "Division"))
+
+    files = []
+    pdf = PdfPages(os.path.join(zone_dir, f"{slug(zone)}.pdf")) if "pdf" in formats else None
+    try:
+        for name, title, page_rows, group_by in pages:
+            figure = _page(plt, title, page_rows, group_by)
+            if pdf is not None:
+                pdf.savefig(figure)
+            if "png" in formats:
+                path = os.path.join(zone_dir, f"{name}.png")
+                figure.savefig(path, dpi=120)
+                files.append(path)
+            plt.close(figure)
+    finally:
+        if pdf is not None:
+            pdf.close()
+            files.insert(0, os.path.join(zone_dir, f"{slug(zone)}.pdf"))
+    return files
+
+
+def generate(frame, directory=REPORTS_DIR, formats=FORMATS, zones=None, workers=None, force=False):
+    """Render the packs of every zone whose rows changed since the last run.
+
+    Returns (rendered zones, cached zones, failed zones).
+    """
+    zone_index = load_zone_index()
+    os.makedirs(directory, exist_ok=True)
+    manifest = load_manifest(directory)
+
+    todo = []
+    cached = []
+    for zone in zones or zone_index.zones:
+        rows = frame[frame["Zone"] == zone] if "Zone" in frame else frame.iloc[:0]
+        if rows.empty:
+            continue
+        digest = zone_digest(rows, formats)
+        entry = manifest.get(zone)
+        if (not force and entry and entry["hash"] == digest
+                and all(os.path.exists(path) for path in entry["files"])):
+            cached.append(zone)
+        else:
+            todo.append((zone, digest, rows))
+
+    rendered = []
+    failed = []
+    if todo:
+        # spawn: workers start clean instead of inheriting the parent's Sheets client and threads
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(todo)),
+                                 mp_context=context) as pool:
+            futures = {
+                pool.submit(render_zone, zone, list(zone_index.regions(zone)), rows, directory, formats):
+                    (zone, digest, len(rows))
+                for zone, digest, rows in todo
+            }
+            for future in as_completed(futures):
+                zone, digest, count = futures[future]
+                try:
+                    files = future.result()
+                except Exception as e:
+                    print(f"{zone}: rendering failed: {e}", file=sys.stderr)
+                    failed.append(zone)
+                    continue
+                manifest[zone] = {"hash": digest, "files": files, "rows": count,
+                                  "rendered": time.strftime("%Y-%m-%d %H:%M:%S")}
+                # Saved per zone so an interrupted run keeps what it finished
+                save_manifest(directory, manifest)
+                rendered.append(zone)
+    return rendered, cached, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render PDF/PNG report packs per zone and region")
+    parser.add_argument("--output", default=REPORTS_DIR, help="Directory for the report packs")
+    parser.add_argument("--format", choices=FORMATS, action="append",
+                        help="Output format (repeatable; default: pdf and png)")
+    parser.add_argument("--zone", action="append", help="Only these zones (repeatable)")
+    parser.add_argument("--workers", type=int, help="Render processes (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="Re-render zones whose data has not changed")
+    parser.add_argument("--no-sync", action="store_true",
+                        help="Use the local snapshots as they are instead of syncing with Sheets first")
+    args = parser.parse_args()
+
+    import shards
+    start = time.perf_counter()
+    frame = shards.federated_frame(sync=not args.no_sync)
+    formats = tuple(args.format or FORMATS)
+    rendered, cached, failed = generate(frame, args.output, formats, args.zone, args.workers, args.force)
+    print(f"Rendered {len(rendered)} zones, {len(cached)} unchanged, {len(failed)} failed "
+          f"in {time.perf_counter() - start:.1f}s -> {args.output}", file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import os
+import time
+import heapq
+import random
+import itertools
+import threading
+from concurrent.futures import Future
+import metrics
+
+
+READ = "read"
+WRITE = "write"
+
+# Lower numbers are served first when requests queue for quota
+PRIORITY_WRITE = 0
+PRIORITY_READ = 1
+PRIORITY_PROBE = 2
+
+# Google Sheets allows roughly 60 read and 60 write requests per minute per user
+READS_PER_MINUTE = float(os.getenv("DL_SHEETS_READS_PER_MINUTE", "60"))
+WRITES_PER_MINUTE = float(os.getenv("DL_SHEETS_WRITES_PER_MINUTE", "60"))
+# Requests that may be sent back to back before the rate limit applies
+BURST = 10
+# Longest a request waits in the queue for quota (seconds)
+ACQUIRE_TIMEOUT = 60
+# Retries for throttled (429) or failed (5xx) requests, with full-jitter backoff
+MAX_RETRIES = 4
+BACKOFF_BASE = 1
+BACKOFF_MAX = 32
+
+
+class QuotaWaitTimeout(Exception):
+    """Raised when a request could not get Sheets quota within ACQUIRE_TIMEOUT"""
+
+
+def status_code(error):
+    """HTTP status of a Sheets API error, if it carries one"""
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) or getattr(error, "code", None)
+
+
+class TokenBucket:
+    """Token bucket whose waiters are served strictly by priority, then arrival"""
+
+    def __init__(self, per_minute, capacity=BURST):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._waiters = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority=PRIORITY_READ, timeout=None):
+        """Take one token, waiting behind higher-priority requests; False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            ticket = (priority, next(self._counter))
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    self._refill()
+                    if self._waiters[0] == ticket and self._tokens >= 1:
+                        self._tokens -= 1
+                        return True
+                    wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.05
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return False
+                        wait = min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+
+class RequestScheduler:
+    """Process-wide gate for Sheets API calls.
+
+    Every call takes a token from the read or write bucket. Identical reads
+    that are in flight at the same time share one request (single flight).
+    Throttled or failed calls are retried with jittered exponential backoff.
+    """
+
+    def __init__(self, reads_per_minute=READS_PER_MINUTE, writes_per_minute=WRITES_PER_MINUTE):
+        self._buckets = {READ: TokenBucket(reads_per_minute), WRITE: TokenBucket(writes_per_minute)}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def run(self, fn, kind=READ, key=None, priority=None):
+        """Call fn() under the quota; reads with the same key coalesce"""
+        if priority is None:
+            priority = PRIORITY_WRITE if kind == WRITE else PRIORITY_READ
+        if key is None or kind == WRITE:
+            return self._execute(fn, kind, priority)
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+        if not leader:
+            metrics.incr("sheets_coalesced")
+            return future.result()
+
+        try:
+            result = self._execute(fn, kind, priority)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def _execute(self, fn, kind, priority):
+        for attempt in range(MAX_RETRIES + 1):
+            if not self._buckets[kind].acquire(priority, ACQUIRE_TIMEOUT):
+                raise QuotaWaitTimeout("Timed out waiting for Google Sheets quota")
+            try:
+                return fn()
+            except Exception as e:
+                status = status_code(e)
+                # A 5xx write may have been applied, so only throttled writes are retried
+                retryable = status == 429 or (kind == READ and status is not None and status >= 500)
+                if not retryable or attempt == MAX_RETRIES:
+                    raise
+                metrics.incr("sheets_retries", status=status)
+            time.sleep(random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)))
+
+
+scheduler = RequestScheduler()
@@ -0,0 +1,229 @@
+from array import array
+from collections import namedtuple
+
+
+# Declarative survey schema: every form field once, in the order flatten_data
+# writes the "DL" worksheet. The widget layout, validator, column order and
+# session record below are all compiled from it at import time.
+
+CLASS_LEVELS = (
+    "Creche/Nursery",
+    "K.G 1",
+    "K.G 2",
+    "Class 1",
+    "Class 2",
+    "Class 3",
+    "Class 4",
+    "Class 5",
+    "Class 6",
+    "JHS 1",
+    "JHS 2",
+    "JHS 3",
+)
+
+PUPIL_FIELDS = ("Males", "Females", "Tuition")
+PUPIL_LABELS = {"Males": "Males*", "Females": "Females*", "Tuition": "Tuition Fees (GHS)*"}
+
+# column: worksheet header; key: widget key; section: form section; group: heading
+# (or class level) the widget is laid out under; kind: choice, text, phone or number
+Field = namedtuple("Field", "column label key section group kind max_value max_chars", defaults=(None, None))
+
+
+def _text(column, label, key, kind="text", max_chars=100):
+    return Field(column, label, key, "school_info", None, kind, None, max_chars)
+
+
+def _number(column, label, key, section, group, max_value=None):
+    return Field(column, label, key, section, group, "number", max_value)
+
+
+FIELDS = (
+    _text("Zone", "Zone*", "zone_select", "choice"),
+    _text("Region", "Region*", "region_select", "choice"),
+    _text("Division", "Division*", "division_select", "choice"),
+    _text("School Name", "Name of School*", "school_name"),
+    _text("Head Teacher", "Name of Head Teacher*", "head_teacher"),
+    _text("Phone", "Phone Number of Head Teacher*", "phone", "phone", 10),
+    _text("WhatsApp", "WhatsApp Number of Head Teacher*", "whatsapp", "phone", 10),
+) + tuple(
+    _number(f"{level} {field}", PUPIL_LABELS[field], f"{level}_{field.lower()}", "pupils", level)
+    for level in CLASS_LEVELS for field in PUPIL_FIELDS
+) + (
+    _number("Admission Fees", "Admission Fees*", "admission_fees", "financial", "Fees (GHS)"),
+    _number("Canteen Fees", "Canteen Fees*", "canteen_fees", "financial", "Fees (GHS)"),
+    _number("Stationary Fees", "Stationary Fees*", "stationary_fees", "financial", "Fees (GHS)"),
+    _number("Head Teacher Salary", "Head Teacher Salary*", "head_salary", "financial", "Salary Ranges (GHS)"),
+    _number("Lowest Teacher Salary", "Lowest Teacher Salary*", "lowest_salary", "financial",
+            "Salary Ranges (GHS)"),
+    _number("Highest Teacher Salary", "Highest Teacher Salary*", "highest_salary", "financial",
+            "Salary Ranges (GHS)"),
+    _number("Number of Teaching Staff", "Number of Teaching Staff*", "teaching_staff_count", "staff", None, 100),
+    _number("Number of Non-Teaching Staff", "Number of Non-Teaching Staff*", "non_teaching_staff_count",
+            "staff", None, 100),
+    _number("Number of Committee Members", "Number of Committee Members*", "committee_members_count",
+            "staff", None, 50),
+)
+
+SECTIONS = ("school_info", "pupils", "financial", "staff")
+
+# Column layout of the worksheet
+BASIC_COLUMNS = tuple(field.column for field in FIELDS if field.kind != "number")
+NUMERIC_COLUMNS = tuple(field.column for field in FIELDS if field.kind == "number")
+PUPIL_COLUMNS = tuple(field.column for field in FIELDS if field.section == "pupils")
+FINANCIAL_COLUMNS = tuple(field.column for field in FIELDS if field.section == "financial")
+# Staff count columns and the maximum the form accepts for each
+STAFF_LIMITS = {field.column: field.max_value for field in FIELDS if field.section == "staff"}
+STAFF_COLUMNS = tuple(STAFF_LIMITS)
+
+HEADERS = ("Timestamp",) + BASIC_COLUMNS + NUMERIC_COLUMNS
+
+# How the Timestamp column is written (e.g. 2025-01-31 08:00:00)
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Position of every column in a row laid out as HEADERS
+COLUMN_INDEX = {column: n for n, column in enumerate(HEADERS)}
+
+
+def _layout():
+    """{section: ((group, (fields...)), ...)} in form order"""
+    layout = {}
+    for field in FIELDS:
+        groups = layout.setdefault(field.section, {})
+        groups.setdefault(field.group, []).append(field)
+    return {section: tuple((group, tuple(fields)) for group, fields in groups.items())
+            for section, groups in layout.items()}
+
+
+# Widget layout per section, compiled once per process
+LAYOUT = _layout()
+FIELD_BY_COLUMN = {field.column: field for field in FIELDS}
+
+
+# Validation messages, shared by the form, the API and the bulk importer
+REQUIRED_BASIC = "All required fields in School Information must be filled"
+INVALID_PHONE = "Valid 10-digit phone number required for Head Teacher"
+INVALID_WHATSAPP = "Valid 10-digit WhatsApp number required for Head Teacher"
+UNKNOWN_ZONE = "Zone, Region and Division are not a known combination"
+NOT_WHOLE_NUMBERS = "Numeric fields must be whole numbers of zero or more"
+PUPILS_REQUIRED = "Pupil Data is required for all classes"
+FINANCIAL_REQUIRED = "All financial fields are required"
+STAFF_REQUIRED = "All staff count fields are required"
+STAFF_LIMIT_EXCEEDED = "Staff counts exceed the form limits"
+
+# Message per rule for the API and the bulk importer; the form keeps its own wording
+MESSAGES = {
+    "basic": REQUIRED_BASIC,
+    "phone": INVALID_PHONE,
+    "whatsapp": INVALID_WHATSAPP,
+    "zone": UNKNOWN_ZONE,
+    "numbers": NOT_WHOLE_NUMBERS,
+    "pupils": PUPILS_REQUIRED,
+    "financial": FINANCIAL_REQUIRED,
+    "staff": STAFF_REQUIRED,
+    "staff_limit": STAFF_LIMIT_EXCEEDED,
+}
+FORM_MESSAGES = {
+    **MESSAGES,
+    "pupils": "Pupil Data is required for {level}. Please enter data for all classes.",
+    "financial": "All financial fields are required.",
+    "staff": "All staff count fields are required.",
+}
+
+_BASIC = slice(1, 1 + len(BASIC_COLUMNS))
+_NUMERIC = slice(_BASIC.stop, len(HEADERS))
+_PHONE = COLUMN_INDEX["Phone"]
+_WHATSAPP = COLUMN_INDEX["WhatsApp"]
+_ZONE = slice(COLUMN_INDEX["Zone"], COLUMN_INDEX["Division"] + 1)
+# (class level, first column) for each level's Males/Females/Tuition triple
+_LEVELS = tuple((level, COLUMN_INDEX[f"{level} {PUPIL_FIELDS[0]}"]) for level in CLASS_LEVELS)
+_FINANCIAL = slice(COLUMN_INDEX[FINANCIAL_COLUMNS[0]], COLUMN_INDEX[FINANCIAL_COLUMNS[-1]] + 1)
+_STAFF = tuple((COLUMN_INDEX[column], limit) for column, limit in STAFF_LIMITS.items())
+
+
+def _is_phone(value):
+    return len(value) == 10 and value.isdigit()
+
+
+def validate(row, zone_index=None, sections=SECTIONS, messages=MESSAGES):
+    """Check a row laid out as HEADERS against the form's rules in one pass.
+
+    Numeric cells are ints, or None where the input was not a whole number of
+    zero or more. The zone combination is only checked when a zone_index is
+    given (the form's selectboxes cannot produce a bad one). Returns the error
+    messages (from `messages`, by rule) in form order, at most one per rule.
+    """
+    errors = []
+    if "school_info" in sections:
+        if not all(row[_BASIC]):
+            errors.append(messages["basic"])
+        if not _is_phone(row[_PHONE] or ""):
+            errors.append(messages["phone"])
+        if not _is_phone(row[_WHATSAPP] or ""):
+            errors.append(messages["whatsapp"])
+        if zone_index is not None and not zone_index.contains(*row[_ZONE]):
+            errors.append(messages["zone"])
+    if None in row[_NUMERIC]:
+        errors.append(messages["numbers"])
+        return errors
+    if "pupils" in sections:
+        for level, start in _LEVELS:
+            if not any(row[start:start + len(PUPIL_FIELDS)]):
+                errors.append(messages["pupils"].format(level=level))
+                break
+    if "financial" in sections and not all(row[_FINANCIAL]):
+        errors.append(messages["financial"])
+    if "staff" in sections:
+        if not all(row[n] for n, _ in _STAFF):
+            errors.append(messages["staff"])
+        if any(row[n] > limit for n, limit in _STAFF):
+            errors.append(messages["staff_limit"])
+    return errors
+
+
+def format_name(name):
+    """Capitalize names properly"""
+    return " ".join(word.capitalize() for word in name.split())
+
+
+def clean_phone(value):
+    """Undo spreadsheet damage to a phone number: a '.0' suffix and a dropped leading zero"""
+    value = str(value).strip()
+    if value.endswith(".0"):
+        value = value[:-2]
+    return "0" + value if len(value) == 9 and value.isdigit() else value
+
+
+class SessionRecord:
+    """One survey answer as a flat row: a short list of texts plus an int64 array.
+
+    Replaces the per-session school_info/class_data/financial_data/staff_counts
+    dicts; with thousands of open sessions the nested dicts dominated memory.
+    """
+
+    __slots__ = ("texts", "numbers")
+
+    def __init__(self):
+        self.texts = [None if FIELD_BY_COLUMN[column].kind == "choice" else "" for column in BASIC_COLUMNS]
+        self.numbers = array("q", bytes(8 * len(NUMERIC_COLUMNS)))
+
+    def __getitem__(self, column):
+        n = COLUMN_INDEX[column] - 1
+        return self.texts[n] if n < len(self.texts) else self.numbers[n - len(self.texts)]
+
+    def __setitem__(self, column, value):
+        n = COLUMN_INDEX[column] - 1
+        if n < len(self.texts):
+            self.texts[n] = value
+        else:
+            self.numbers[n - len(self.texts)] = value
+
+    def row(self, timestamp=""):
+        """The values laid out as HEADERS, as they are validated and written"""
+        return [timestamp, *self.texts, *self.numbers]
+
+    def as_record(self, timestamp):
+        """The row as a {header: value} dict with names formatted, for submission"""
+        row = self.row(timestamp)
+        for column in ("School Name", "Head Teacher"):
+            row[COLUMN_INDEX[column]] = format_name(row[COLUMN_INDEX[column]])
+        return dict(zip(HEADERS, row))
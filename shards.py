@@ -0,0 +1,149 @@
+import os
+import re
+import time
+import logging
+import datetime
+import threading
+import metrics
+import sharedcache
+from connect import WORKSHEET_NAME, with_spreadsheet
+from duplicates import get_index
+from snapshot import get_snapshot, local_worksheets
+
+
+# Submissions made before sharding live here; it is still read for duplicates and reports
+LEGACY_WORKSHEET = WORKSHEET_NAME
+# Seconds the list of shard worksheets is cached
+SHARD_LIST_TTL = 300
+
+logger = logging.getLogger("dl_schools.shards")
+
+_SHARD_TITLE = re.compile(r"^(?P<zone>.+) (?P<year>\d{4})$")
+
+_shard_list = None
+_shard_list_at = None
+_lock = threading.Lock()
+
+
+def timestamp_year(timestamp):
+    """Year of a Timestamp cell such as '2025-01-31 08:00:00', or None if it is blank or not a date"""
+    try:
+        return datetime.datetime.fromisoformat(str(timestamp).strip()).year
+    except ValueError:
+        return None
+
+
+def shard_year(title):
+    """Survey year in a shard title ('Ashanti Zone A 2025' -> 2025), None for the legacy sheet"""
+    match = _SHARD_TITLE.match(title or "")
+    return int(match["year"]) if match else None
+
+
+def survey_year(timestamp=None):
+    """Survey year of a submission: DL_SURVEY_YEAR if set, else the timestamp's (or today's) year.
+
+    Raises ValueError for a timestamp that is not a date.
+    """
+    if os.getenv("DL_SURVEY_YEAR"):
+        return int(os.getenv("DL_SURVEY_YEAR"))
+    if timestamp:
+        year = timestamp_year(timestamp)
+        if year is None:
+            raise ValueError(f"Timestamp {timestamp!r} is not a date")
+        return year
+    return datetime.date.today().year
+
+
+def shard_name(zone, year=None):
+    """Worksheet holding a zone's submissions for one survey year, e.g. 'Ashanti Zone A 2025'"""
+    title = " ".join(str(zone).split())
+    # Sheets titles are limited to 100 characters
+    return f"{title[:94]} {year or survey_year()}"
+
+
+def shard_for(record):
+    """Worksheet a new submission goes to: its zone's shard for the current survey year.
+
+    The row's own Timestamp is not used, since API clients can send any date.
+    """
+    return shard_name(record["Zone"])
+
+
+def duplicate_indexes(zone, year=None):
+    """Indexes a school in `zone` must be checked against: its shard and the legacy sheet"""
+    return [get_index(shard_name(zone, year)), get_index(LEGACY_WORKSHEET)]
+
+
+def sync_duplicates(zone, year=None):
+    """Sync the indexes a school in `zone` is checked against (rate limited).
+
+    A failed sync never fails the check: the last synced keys are used and the
+    submission goes on to the outbox, which absorbs the outage.
+    """
+    for index in duplicate_indexes(zone, year):
+        try:
+            index.sync()
+        except Exception:
+            # Sheets is unreachable or failing (or the local snapshot is broken); fall back to the last synced keys
+            metrics.incr("duplicate_sync_failures")
+            logger.warning("Duplicate index sync failed for '%s'; checking against the last synced keys",
+                           index.worksheet_name, exc_info=True)
+
+
+def is_duplicate(key, zone, year=None, sync=True):
+    """Check a duplicate key against the relevant shard, syncing its indexes first unless `sync` is off"""
+    if sync:
+        sync_duplicates(zone, year)
+    return any(key in index for index in duplicate_indexes(zone, year))
+
+
+def list_shards(force=False):
+    """Titles of the legacy sheet and every zone-year shard in the spreadsheet"""
+    global _shard_list, _shard_list_at
+    with _lock:
+        if force or _shard_list is None or time.monotonic() - _shard_list_at > SHARD_LIST_TTL:
+            # Another process on the host (normally the refresher) may have listed them recently
+            shared = None if force else sharedcache.get("shards", max_age=SHARD_LIST_TTL)
+            if shared is not None:
+                _shard_list = shared[0]
+            else:
+                titles = with_spreadsheet(
+                    lambda spreadsheet: [worksheet.title for worksheet in spreadsheet.worksheets()],
+                    key="worksheets"
+                )
+                _shard_list = [title for title in titles if title == LEGACY_WORKSHEET or _SHARD_TITLE.match(title)]
+                sharedcache.put("shards", _shard_list)
+            _shard_list_at = time.monotonic()
+        return list(_shard_list)
+
+
+def federated_snapshots(sync=True, force=False):
+    """Snapshots of every shard, each brought up to date (rate limited unless forced) when `sync` is set.
+
+    If Sheets cannot be reached, the shards already on disk are served as last synced.
+    """
+    try:
+        titles = list_shards()
+    except Exception:
+        titles = local_worksheets()
+    snapshots = [get_snapshot(title) for title in titles]
+    if sync:
+        for snapshot in snapshots:
+            try:
+                snapshot.sync(force=force)
+            except Exception:
+                pass  # Keep serving the last synced copy of this shard
+    return snapshots
+
+
+def federated_frame(sync=True, force=False):
+    """All shards merged into one DataFrame for reporting"""
+    import pandas as pd
+    frames = [snapshot.frame() for snapshot in federated_snapshots(sync, force) if snapshot.version]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def refresh():
+    """One refresher pass: bring the shard list and every shard's snapshot up to date for the host"""
+    federated_snapshots(sync=True)
+    sharedcache.prune()
@@ -0,0 +1,172 @@
+import os
+import json
+import time
+import uuid
+import atexit
+import socket
+import sqlite3
+import threading
+
+
+SHARED_CACHE_PATH = os.getenv("DL_SHARED_CACHE_PATH", os.path.join(".cache", "shared.db"))
+# Lease held by the one process on this host that reads Sheets for everybody
+REFRESHER = "sheets-refresher"
+# Seconds a lease lasts without renewal; a crashed holder is replaced after this
+LEASE_TTL = 45
+# Seconds between refresher passes (the holder renews its lease on each)
+REFRESH_INTERVAL = 15
+# Shared duplicate keys are dropped after this long; the sheet has them by then (seconds)
+KEY_RETENTION = 24 * 3600
+
+# Unique per process, even across hosts sharing a network drive
+OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS leases (
+        name TEXT PRIMARY KEY,
+        owner TEXT NOT NULL,
+        expires REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS entries (
+        name TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        updated REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS keys (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        scope TEXT NOT NULL,
+        key TEXT NOT NULL,
+        created REAL NOT NULL,
+        UNIQUE (scope, key)
+    )""",
+)
+
+_local = threading.local()
+_held = set()
+_held_lock = threading.Lock()
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+def _connect():
+    """This thread's connection to the shared database (opened once per thread)"""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.path != SHARED_CACHE_PATH:
+        directory = os.path.dirname(SHARED_CACHE_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(SHARED_CACHE_PATH, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Everything here can be rebuilt from Sheets, so losing the last commit on power loss is fine
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        _local.conn = conn
+        _local.path = SHARED_CACHE_PATH
+    return conn
+
+
+def acquire(name=REFRESHER, ttl=LEASE_TTL):
+    """Take or renew the lease `name`; True if this process holds it for the next `ttl` seconds"""
+    now = time.time()
+    cursor = _connect().execute(
+        "INSERT INTO leases (name, owner, expires) VALUES (?, ?, ?) "
+        "ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires = excluded.expires "
+        "WHERE leases.owner = excluded.owner OR leases.expires <= ?",
+        (name, OWNER, now + ttl, now)
+    )
+    acquired = cursor.rowcount == 1
+    if acquired:
+        with _held_lock:
+            _held.add(name)
+    return acquired
+
+
+def release(name=REFRESHER):
+    """Give up a lease so another process can take it at once"""
+    _connect().execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, OWNER))
+    with _held_lock:
+        _held.discard(name)
+
+
+@atexit.register
+def _release_all():
+    # Short-lived tools (bulk import, export) must not leave the servers without a refresher
+    with _held_lock:
+        names = list(_held)
+    for name in names:
+        try:
+            release(name)
+        except sqlite3.Error:
+            pass
+
+
+def put(name, value):
+    """Publish a JSON-serialisable value; every write bumps its version stamp"""
+    _connect().execute(
+        "INSERT INTO entries (name, value, version, updated) VALUES (?, ?, 1, ?) "
+        "ON CONFLICT (name) DO UPDATE SET value = excluded.value, version = entries.version + 1, "
+        "updated = excluded.updated",
+        (name, json.dumps(value), time.time())
+    )
+
+
+def get(name, max_age=None):
+    """Return (value, version, updated) for a shared entry, or None if missing or older than max_age"""
+    row = _connect().execute("SELECT value, version, updated FROM entries WHERE name = ?", (name,)).fetchone()
+    if row is None or (max_age is not None and time.time() - row[2] > max_age):
+        return None
+    return json.loads(row[0]), row[1], row[2]
+
+
+def add_key(scope, key):
+    """Share a duplicate-detection key (a tuple of strings) with the other processes.
+
+    Returns False if some process had already shared it, so the insert doubles as
+    an atomic claim across processes.
+    """
+    cursor = _connect().execute(
+        "INSERT OR IGNORE INTO keys (scope, key, created) VALUES (?, ?, ?)",
+        (scope, json.dumps(key), time.time())
+    )
+    return cursor.rowcount == 1
+
+
+def discard_key(scope, key):
+    """Withdraw a key claimed for a submission that was not queued after all"""
+    _connect().execute("DELETE FROM keys WHERE scope = ? AND key = ?", (scope, json.dumps(key)))
+
+
+def keys_since(scope, after=0):
+    """Keys shared after id `after`, as (last id, [key tuples])"""
+    rows = _connect().execute(
+        "SELECT id, key FROM keys WHERE scope = ? AND id > ? ORDER BY id", (scope, after)
+    ).fetchall()
+    if not rows:
+        return after, []
+    return rows[-1][0], [tuple(json.loads(key)) for _, key in rows]
+
+
+def prune():
+    _connect().execute("DELETE FROM keys WHERE created < ?", (time.time() - KEY_RETENTION,))
+
+
+def _run_refresher(refresh):
+    while True:
+        try:
+            if acquire(REFRESHER):
+                refresh()
+        except Exception:
+            pass  # Try again on the next pass
+        time.sleep(REFRESH_INTERVAL)
+
+
+def start_refresher(refresh):
+    """Compete for the refresher lease in the background and run `refresh` while holding it (idempotent)"""
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None or not _refresher.is_alive():
+            _refresher = threading.Thread(target=_run_refresher, args=(refresh,),
+                                          name="shared-cache-refresher", daemon=True)
+            _refresher.start()
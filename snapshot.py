@@ -0,0 +1,288 @@
+import os
+import re
+import json
+import time
+import shutil
+import threading
+import contextlib
+import sharedcache
+from connect import WORKSHEET_NAME, with_worksheet
+from schema import NUMERIC_COLUMNS
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process publish lock
+    fcntl = None
+
+
+SNAPSHOT_DIR = os.getenv("DL_SNAPSHOT_DIR", os.path.join(".cache", "snapshot"))
+# Minimum seconds between delta syncs
+SYNC_INTERVAL = 15
+# Seconds between full re-reads that pick up manual edits to existing rows
+RECONCILE_INTERVAL = 6 * 3600
+# Seconds before a worksheet found missing or empty is looked up again
+EMPTY_RECHECK_INTERVAL = 300
+# Times read() re-reads meta.json when the version it names was removed meanwhile
+READ_ATTEMPTS = 3
+
+_NUMERIC = frozenset(NUMERIC_COLUMNS)
+
+
+def column_letter(number):
+    """Convert a 1-based column number to its A1 letters (1 -> A, 27 -> AA)"""
+    letters = ""
+    while number:
+        number, remainder = divmod(number - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def _typed(column, values):
+    """Numeric survey columns become float64 (NaN when blank), everything else fixed-width unicode"""
+    import numpy as np
+    if column in _NUMERIC:
+        import pandas as pd
+        cleaned = pd.Series(values, dtype=object).astype(str).str.replace(",", "", regex=False)
+        return pd.to_numeric(cleaned, errors="coerce").to_numpy(dtype=np.float64)
+    return np.array(values, dtype=str) if values else np.array([], dtype="<U1")
+
+
+def _build_columns(headers, rows):
+    return {
+        column: _typed(column, [row[i] if i < len(row) else "" for row in rows])
+        for i, column in enumerate(headers)
+    }
+
+
+class Snapshot:
+    """Local columnar copy of a worksheet, one .npy file per column.
+
+    Delta syncs fetch only the rows below the last synced row; a periodic full
+    reconcile replaces everything to pick up edits made directly in the sheet.
+    Each write goes to a new version directory and is published by atomically
+    replacing meta.json, so readers never see a half-written snapshot.
+
+    Several processes on a host share one snapshot directory. Only the holder
+    of the shared refresher lease reads Sheets; the others just pick up the
+    latest published version (meta.json's version is the coherence stamp).
+    """
+
+    def __init__(self, worksheet_name=WORKSHEET_NAME, directory=None,
+                 sync_interval=SYNC_INTERVAL, reconcile_interval=RECONCILE_INTERVAL):
+        self.worksheet_name = worksheet_name
+        self.path = os.path.join(directory or SNAPSHOT_DIR, re.sub(r"[^\w.-]+", "_", worksheet_name))
+        self.sync_interval = sync_interval
+        self.reconcile_interval = reconcile_interval
+        self._lock = threading.RLock()
+        self._exclusive_depth = 0
+        self._meta = None
+        self._columns = None
+        self._last_sync = None
+
+    def _read_meta(self):
+        try:
+            with open(os.path.join(self.path, "meta.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"headers": [], "rows": 0, "version": 0, "generation": 0, "reconciled": 0}
+
+    def read(self):
+        """Return (meta, columns) for the latest published version.
+
+        Columns are memory-mapped read-only arrays keyed by header name.
+        """
+        # numpy is imported on first use to keep it off the app's cold-start import path
+        import numpy as np
+        with self._lock:
+            for attempt in range(READ_ATTEMPTS):
+                meta = self._read_meta()
+                if self._meta is not None and self._meta["version"] == meta["version"]:
+                    break
+                directory = os.path.join(self.path, f"v{meta['version']:06d}")
+                mmap_mode = "r" if meta["rows"] else None
+                try:
+                    self._columns = {
+                        column: np.load(os.path.join(directory, f"{i:03d}.npy"), mmap_mode=mmap_mode)
+                        for i, column in enumerate(meta["headers"])
+                    }
+                except FileNotFoundError:
+                    # Another process published twice since we read meta.json; look again
+                    if attempt == READ_ATTEMPTS - 1:
+                        raise
+                    continue
+                self._meta = meta
+                break
+            return self._meta, self._columns
+
+    def columns(self):
+        return self.read()[1]
+
+    @property
+    def version(self):
+        return self.read()[0]["version"]
+
+    def frame(self):
+        """The snapshot as a pandas DataFrame"""
+        import numpy as np
+        import pandas as pd
+        meta, columns = self.read()
+        return pd.DataFrame({column: np.asarray(columns[column]) for column in meta["headers"]})
+
+    @contextlib.contextmanager
+    def _exclusive(self):
+        """Hold this snapshot's cross-process lock (re-entrant within a process)"""
+        with self._lock:
+            if fcntl is None or self._exclusive_depth:
+                self._exclusive_depth += 1
+                try:
+                    yield
+                finally:
+                    self._exclusive_depth -= 1
+                return
+            os.makedirs(self.path, exist_ok=True)
+            with open(os.path.join(self.path, ".lock"), "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._exclusive_depth = 1
+                try:
+                    yield
+                finally:
+                    self._exclusive_depth = 0
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def sync(self, force=False):
+        """Bring the snapshot up to date; returns True if anything changed.
+
+        Unless forced, processes that do not hold the refresher lease only
+        reload what the refresher last published.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._last_sync is not None and now - self._last_sync < self.sync_interval:
+                return False
+            if not force and not sharedcache.acquire(sharedcache.REFRESHER):
+                previous = self._meta["version"] if self._meta else None
+                self._last_sync = now
+                return self.read()[0]["version"] != previous
+            with self._exclusive():
+                meta = self._read_meta()
+                # A zone with no shard yet is only looked up again every EMPTY_RECHECK_INTERVAL
+                interval = self.reconcile_interval if meta["headers"] else EMPTY_RECHECK_INTERVAL
+                if time.time() - meta["reconciled"] > interval or (force and not meta["headers"]):
+                    changed = self.reconcile()
+                elif meta["headers"]:
+                    changed = self._sync_delta(meta)
+                else:
+                    changed = False
+            self._last_sync = now
+            return changed
+
+    def reconcile(self):
+        """Replace the snapshot with a full read of the worksheet; returns True if anything changed.
+
+        An unchanged worksheet only has its reconcile time renewed, so readers
+        keep their version (and the indexes built from it).
+        """
+        with self._exclusive():
+            values = with_worksheet(lambda worksheet: worksheet.get_all_values(), self.worksheet_name,
+                                    key="get_all_values", missing=[])
+            meta = self._read_meta()
+            headers = values[0] if values else []
+            columns = _build_columns(headers, values[1:])
+            if self._unchanged(meta, headers, columns, len(values[1:])):
+                self._write_meta(dict(meta, worksheet=self.worksheet_name, reconciled=time.time(),
+                                      synced=time.time()))
+                return False
+            self._publish(meta, headers, columns, len(values[1:]),
+                          generation=meta["generation"] + 1, reconciled=time.time())
+            return True
+
+    def _unchanged(self, meta, headers, columns, rows):
+        """Whether a full read matches the published version"""
+        import numpy as np
+        if headers != meta["headers"] or rows != meta["rows"]:
+            return False
+        if not rows:
+            return True
+        _, current = self.read()
+        return all(np.array_equal(current[column], columns[column], equal_nan=columns[column].dtype.kind == "f")
+                   for column in headers)
+
+    def _sync_delta(self, meta):
+        headers = meta["headers"]
+        first_row = meta["rows"] + 2  # sheet rows are 1-based and row 1 is the header
+        rows = with_worksheet(
+            lambda worksheet: worksheet.get(f"A{first_row}:{column_letter(len(headers))}"),
+            self.worksheet_name,
+            key=f"rows_from:{first_row}",
+            missing=[]
+        )
+        if not rows:
+            return False
+        import numpy as np
+        _, columns = self.read()
+        delta = _build_columns(headers, rows)
+        merged = {column: np.concatenate([columns[column], delta[column]]) for column in headers}
+        self._publish(meta, headers, merged, meta["rows"] + len(rows),
+                      generation=meta["generation"], reconciled=meta["reconciled"])
+        return True
+
+    def _publish(self, meta, headers, columns, rows, generation, reconciled):
+        import numpy as np
+        version = meta["version"] + 1
+        directory = os.path.join(self.path, f"v{version:06d}")
+        os.makedirs(directory, exist_ok=True)
+        for i, column in enumerate(headers):
+            np.save(os.path.join(directory, f"{i:03d}.npy"), columns[column])
+
+        new_meta = {
+            "worksheet": self.worksheet_name,
+            "headers": headers,
+            "rows": rows,
+            "version": version,
+            "generation": generation,
+            "reconciled": reconciled,
+            "synced": time.time(),
+        }
+        self._write_meta(new_meta)
+
+        # The previous version stays on disk for readers in other processes that
+        # read the old meta.json a moment ago; anything older is removed (open
+        # memory maps stay valid on POSIX)
+        keep = {f"v{version:06d}", f"v{version - 1:06d}"}
+        for name in os.listdir(self.path):
+            if name.startswith("v") and name not in keep:
+                shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+    def _write_meta(self, meta):
+        os.makedirs(self.path, exist_ok=True)
+        meta_path = os.path.join(self.path, "meta.json")
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def local_worksheets(directory=None):
+    """Names of the worksheets that have a snapshot on disk"""
+    directory = directory or SNAPSHOT_DIR
+    names = []
+    if not os.path.isdir(directory):
+        return names
+    for entry in sorted(os.listdir(directory)):
+        try:
+            with open(os.path.join(directory, entry, "meta.json")) as f:
+                names.append(json.load(f)["worksheet"])
+        except (OSError, ValueError, KeyError):
+            continue
+    return names
+
+
+def get_snapshot(worksheet_name=WORKSHEET_NAME):
+    """Return the process-shared snapshot of a worksheet"""
+    with _snapshots_lock:
+        if worksheet_name not in _snapshots:
+            _snapshots[worksheet_name] = Snapshot(worksheet_name)
+        return _snapshots[worksheet_name]
@@ -0,0 +1,66 @@
+import threading
+import fuzzy
+import metrics
+import shards
+import sharedcache
+from duplicates import get_index, record_key
+from outbox import enqueue_many
+
+
+DUPLICATE_MESSAGE = "This headmaster's information already exists in the database for this region and division."
+SUCCESS_MESSAGE = "✅ Data submitted successfully!"
+
+# Check-then-add must be atomic or two concurrent copies of a school both get through
+_lock = threading.Lock()
+
+
+def submit_records(records):
+    """Duplicate-check flattened rows and queue the new ones in one outbox transaction.
+
+    Returns (ok, message) per record, in order. Rows are appended to their
+    zone's shard by the outbox worker in the background.
+    """
+    results = []
+    queued = []
+    positions = []  # index in results of each queued record
+    year = shards.survey_year()
+    # Syncing may wait on Sheets quota, so it happens before the lock is taken
+    for zone in {record["Zone"] for record in records}:
+        shards.sync_duplicates(zone, year)
+    with _lock:
+        seen = set()
+        for record in records:
+            key = record_key(record)
+            worksheet = shards.shard_for(record)
+            # The lock only covers this process; the shared key table settles races with the others
+            if (key in seen or shards.is_duplicate(key, record["Zone"], year, sync=False)
+                    or not sharedcache.add_key(worksheet, key)):
+                results.append((False, DUPLICATE_MESSAGE))
+                continue
+            seen.add(key)
+            queued.append((record, worksheet, None))
+            positions.append(len(results))
+            results.append((True, SUCCESS_MESSAGE))
+
+        added = []
+        if queued:
+            try:
+                added = enqueue_many(queued)
+            except Exception:
+                for record, worksheet, _ in queued:
+                    sharedcache.discard_key(worksheet, record_key(record))
+                raise
+            for (record, worksheet, _), n, was_added in zip(queued, positions, added):
+                if not was_added:
+                    # The outbox already holds this exact row (it was submitted before)
+                    results[n] = (False, DUPLICATE_MESSAGE)
+                    continue
+                get_index(worksheet).add(record)
+                fuzzy.get_fuzzy_index(worksheet).add(record)
+    metrics.incr("submissions", sum(added))
+    return results
+
+
+def submit_record(record):
+    """Duplicate-check and queue a flattened row; runs on the submission executor"""
+    return submit_records([record])[0]
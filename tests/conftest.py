@@ -0,0 +1,20 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aggregates
+import outbox
+import sharedcache
+import snapshot
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Point every on-disk cache (outbox, shared cache, snapshots, aggregates) at a fresh directory"""
+    monkeypatch.setattr(outbox, "OUTBOX_PATH", str(tmp_path / "outbox.db"))
+    monkeypatch.setattr(sharedcache, "SHARED_CACHE_PATH", str(tmp_path / "shared.db"))
+    monkeypatch.setattr(snapshot, "SNAPSHOT_DIR", str(tmp_path / "snapshot"))
+    monkeypatch.setattr(aggregates, "AGGREGATES_PATH", str(tmp_path / "aggregates.db"))
+    return tmp_path
@@ -0,0 +1,69 @@
+import time
+import pytest
+from health import CircuitBreaker, CircuitOpenError
+from scheduler import QuotaWaitTimeout
+
+
+def fail():
+    raise ConnectionError("Sheets is down")
+
+
+def open_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05, excluded=(QuotaWaitTimeout,))
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+    return breaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = open_breaker()
+    assert breaker.is_open
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call(calls.append, 1)
+    assert calls == []
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.call(lambda: "ok") == "ok"
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert not breaker.is_open
+
+
+def test_excluded_errors_do_not_count():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05, excluded=(QuotaWaitTimeout,))
+
+    def timeout():
+        raise QuotaWaitTimeout()
+    with pytest.raises(QuotaWaitTimeout):
+        breaker.call(timeout)
+    assert not breaker.is_open
+
+
+def test_half_open_lets_one_trial_through_and_closes_on_success():
+    breaker = open_breaker()
+    time.sleep(0.06)
+
+    def trial():
+        # Other calls are still refused while the trial is in flight
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: None)
+        return "ok"
+    assert breaker.call(trial) == "ok"
+    assert not breaker.is_open
+    assert breaker.call(lambda: "ok") == "ok"
+
+
+def test_failed_trial_reopens_at_once():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.is_open
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: None)
@@ -0,0 +1,51 @@
+import pytest
+import fake_sheets
+import outbox
+from schema import HEADERS
+
+
+@pytest.fixture
+def sheet(cache_dir, monkeypatch):
+    # Flush by hand instead of from the background writer
+    monkeypatch.setattr(outbox, "start_worker", lambda: None)
+    return fake_sheets.install([list(HEADERS)])
+
+
+def record(timestamp="2026-01-01 08:00:00", **values):
+    row = {column: "" for column in HEADERS}
+    row.update({"Timestamp": timestamp, "Zone": "Zone A", "Head Teacher": "John Mensah", "Phone": "0201234567"})
+    row.update(values)
+    return row
+
+
+def test_resubmissions_collapse_whatever_their_timestamp(sheet):
+    assert outbox.enqueue_many([(record(), "DL", None), (record("2026-01-02 09:00:00"), "DL", None)]) == [True, False]
+    assert outbox.enqueue(record("2026-01-03 10:00:00"), "DL") is False
+    assert outbox.pending_count() == 1
+
+
+def test_changed_rows_are_queued_separately(sheet):
+    assert outbox.enqueue_many([(record(), "DL", None), (record(Phone="0209999999"), "DL", None)]) == [True, True]
+    assert outbox.pending_count() == 2
+
+
+def test_flush_writes_each_row_once(sheet):
+    outbox.enqueue(record(), "DL")
+    outbox.enqueue(record(), "DL")
+    assert outbox.flush() == 1
+    assert outbox.flush() == 0
+    assert outbox.pending_count() == 0
+    assert len(sheet.rows) == 2
+
+    # Sent rows are remembered, so a later resubmission is still collapsed
+    assert outbox.enqueue(record("2026-02-01 08:00:00"), "DL") is False
+
+
+def test_failed_append_keeps_the_rows_queued(sheet, monkeypatch):
+    outbox.enqueue(record(), "DL")
+
+    def fail(worksheet_name, headers, rows):
+        raise ConnectionError("Sheets is down")
+    monkeypatch.setattr(outbox, "_append_batch", fail)
+    assert outbox.flush() == 0
+    assert outbox.pending_count() == 1
@@ -0,0 +1,49 @@
+import time
+import threading
+from scheduler import PRIORITY_READ, PRIORITY_WRITE, TokenBucket
+
+
+def test_burst_then_rate_limited():
+    bucket = TokenBucket(per_minute=60, capacity=2)
+    assert bucket.acquire(timeout=0)
+    assert bucket.acquire(timeout=0)
+    assert not bucket.acquire(timeout=0.05)
+
+
+def test_higher_priority_waiter_is_served_first():
+    # One token every 0.2s once the single burst token is gone
+    bucket = TokenBucket(per_minute=300, capacity=1)
+    assert bucket.acquire()
+    served = []
+
+    def take(name, priority):
+        bucket.acquire(priority, timeout=5)
+        served.append(name)
+
+    read = threading.Thread(target=take, args=("read", PRIORITY_READ))
+    read.start()
+    time.sleep(0.05)
+    write = threading.Thread(target=take, args=("write", PRIORITY_WRITE))
+    write.start()
+    read.join()
+    write.join()
+    assert served == ["write", "read"]
+
+
+def test_equal_priority_is_first_come_first_served():
+    bucket = TokenBucket(per_minute=300, capacity=1)
+    assert bucket.acquire()
+    served = []
+
+    def take(name):
+        bucket.acquire(PRIORITY_READ, timeout=5)
+        served.append(name)
+
+    threads = []
+    for name in ("first", "second"):
+        threads.append(threading.Thread(target=take, args=(name,)))
+        threads[-1].start()
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join()
+    assert served == ["first", "second"]
@@ -0,0 +1,131 @@
+import pandas as pd
+import pytest
+import bulk_import
+import schema
+from schema import CLASS_LEVELS, FORM_MESSAGES, HEADERS, MESSAGES, NUMERIC_COLUMNS, SessionRecord, validate
+
+
+def complete_record():
+    record = SessionRecord()
+    for column, value in (("Zone", "Zone A"), ("Region", "Region 1"), ("Division", "Division 1"),
+                          ("School Name", "Grace Academy"), ("Head Teacher", "John Mensah"),
+                          ("Phone", "0201234567"), ("WhatsApp", "0501234567")):
+        record[column] = value
+    for column in NUMERIC_COLUMNS:
+        record[column] = 5
+    return record
+
+
+def first_error(record, sections=schema.SECTIONS):
+    """What the form shows: the first message only"""
+    errors = validate(record.row(), sections=sections, messages=FORM_MESSAGES)
+    return errors[0] if errors else None
+
+
+def test_complete_record_is_valid():
+    assert validate(complete_record().row()) == []
+
+
+# The messages of the form's original hand-written validators
+@pytest.mark.parametrize("column, value, sections, message", [
+    ("School Name", "", ("school_info",), "All required fields in School Information must be filled"),
+    ("Zone", None, ("school_info",), "All required fields in School Information must be filled"),
+    ("Phone", "020123456", ("school_info",), "Valid 10-digit phone number required for Head Teacher"),
+    ("Phone", "02012345ab", ("school_info",), "Valid 10-digit phone number required for Head Teacher"),
+    ("WhatsApp", "050123456", ("school_info",), "Valid 10-digit WhatsApp number required for Head Teacher"),
+    ("Admission Fees", 0, ("financial",), "All financial fields are required."),
+    ("Highest Teacher Salary", 0, ("financial",), "All financial fields are required."),
+    ("Number of Committee Members", 0, ("staff",), "All staff count fields are required."),
+])
+def test_form_messages_match_the_original_validators(column, value, sections, message):
+    record = complete_record()
+    record[column] = value
+    assert first_error(record, sections) == message
+
+
+def test_pupil_message_names_the_first_empty_class():
+    record = complete_record()
+    for level in CLASS_LEVELS[3:5]:
+        for field in schema.PUPIL_FIELDS:
+            record[f"{level} {field}"] = 0
+    assert first_error(record, ("pupils",)) == (
+        f"Pupil Data is required for {CLASS_LEVELS[3]}. Please enter data for all classes."
+    )
+
+
+def test_a_class_with_only_tuition_counts_as_filled():
+    record = complete_record()
+    record[f"{CLASS_LEVELS[0]} Males"] = 0
+    record[f"{CLASS_LEVELS[0]} Females"] = 0
+    assert first_error(record, ("pupils",)) is None
+
+
+def test_basic_info_checks_stop_at_the_first_failure_in_form_order():
+    record = complete_record()
+    record["Head Teacher"] = ""
+    record["Phone"] = "123"
+    assert first_error(record, ("school_info",)) == "All required fields in School Information must be filled"
+
+
+def test_sections_limit_the_rules_applied():
+    record = complete_record()
+    record["Admission Fees"] = 0
+    assert first_error(record, ("school_info", "pupils")) is None
+
+
+def test_api_messages_and_rules():
+    row = complete_record().row("2026-01-01 08:00:00")
+    row[HEADERS.index("Canteen Fees")] = None
+    assert validate(row) == [MESSAGES["numbers"]]
+
+    row = complete_record().row("2026-01-01 08:00:00")
+    row[HEADERS.index("Number of Committee Members")] = 51
+    row[HEADERS.index("Stationary Fees")] = 0
+    assert validate(row) == [MESSAGES["financial"], MESSAGES["staff_limit"]]
+
+
+class ZoneIndex:
+    triples = {("Zone A", "Region 1", "Division 1")}
+    zones = ["Zone A"]
+
+    def contains(self, zone, region, division):
+        return (zone, region, division) in self.triples
+
+
+@pytest.mark.parametrize("column, value", [
+    ("School Name", ""),
+    ("Phone", "12345"),
+    ("WhatsApp", "abc"),
+    ("Division", "Division 9"),
+    ("Class 2 Males", "1.5"),
+    ("Canteen Fees", "0"),
+    ("Number of Teaching Staff", "0"),
+    ("Number of Teaching Staff", "101"),
+    (f"{CLASS_LEVELS[-1]} Tuition", "0"),
+])
+def test_bulk_importer_agrees_with_the_row_validator(column, value):
+    values = {column: str(cell) for column, cell in zip(HEADERS[1:], complete_record().row()[1:])}
+    values[column] = value
+    if column.startswith(CLASS_LEVELS[-1]):
+        values[f"{CLASS_LEVELS[-1]} Males"] = values[f"{CLASS_LEVELS[-1]} Females"] = "0"
+    _, errors = bulk_import.validate(pd.DataFrame([values]), ZoneIndex())
+
+    row = [""] + [values[header] for header in HEADERS[1:]]
+    for n, header in enumerate(HEADERS):
+        if header in NUMERIC_COLUMNS:
+            number = float(row[n])
+            row[n] = int(number) if number >= 0 and number == int(number) else None
+    assert [message for message in errors.iloc[0].split("; ") if message] == validate(row, ZoneIndex())
+
+
+@pytest.mark.parametrize("value, cleaned", [
+    ("0201234567", "0201234567"),
+    (" 201234567 ", "0201234567"),
+    ("201234567.0", "0201234567"),
+    (201234567, "0201234567"),
+    ("020-123-4567", "020-123-4567"),
+    ("", ""),
+])
+def test_clean_phone(value, cleaned):
+    assert schema.clean_phone(value) == cleaned
+    assert list(bulk_import.clean_phones(pd.Series([str(value)]))) == [cleaned]
@@ -0,0 +1,46 @@
+import time
+import sharedcache
+
+
+def as_other_process(monkeypatch):
+    monkeypatch.setattr(sharedcache, "OWNER", "other-host:1:abcd")
+
+
+def test_lease_is_exclusive_until_it_expires(cache_dir, monkeypatch):
+    owner = sharedcache.OWNER
+    assert sharedcache.acquire("lease", ttl=0.2)
+    assert sharedcache.acquire("lease", ttl=0.2)  # renewal by the holder
+
+    as_other_process(monkeypatch)
+    assert not sharedcache.acquire("lease", ttl=0.2)
+    time.sleep(0.25)
+    # The holder crashed (stopped renewing): the lease is taken over
+    assert sharedcache.acquire("lease", ttl=10)
+
+    monkeypatch.setattr(sharedcache, "OWNER", owner)
+    assert not sharedcache.acquire("lease", ttl=10)
+
+
+def test_release_hands_the_lease_over_at_once(cache_dir, monkeypatch):
+    owner = sharedcache.OWNER
+    assert sharedcache.acquire("lease", ttl=10)
+    as_other_process(monkeypatch)
+    # Only the holder can release it
+    sharedcache.release("lease")
+    assert not sharedcache.acquire("lease", ttl=10)
+
+    monkeypatch.setattr(sharedcache, "OWNER", owner)
+    sharedcache.release("lease")
+    as_other_process(monkeypatch)
+    assert sharedcache.acquire("lease", ttl=10)
+
+
+def test_add_key_is_an_atomic_claim(cache_dir):
+    key = ("john mensah", "0201234567", "0501234567", "Region 1", "Division 1")
+    assert sharedcache.add_key("Zone A 2026", key)
+    assert not sharedcache.add_key("Zone A 2026", key)
+    assert sharedcache.add_key("Zone B 2026", key)
+
+    sharedcache.discard_key("Zone A 2026", key)
+    assert sharedcache.add_key("Zone A 2026", key)
+    assert sharedcache.keys_since("Zone A 2026")[1] == [key]
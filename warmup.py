@@ -0,0 +1,45 @@
+import threading
+import fuzzy
+import health
+import metrics
+import shards
+import sharedcache
+from connect import get_worksheet
+from duplicates import get_index
+from outbox import start_worker
+from snapshot import local_worksheets
+from zones import load_zone_index
+
+
+_started = False
+_lock = threading.Lock()
+
+
+def _warm_up():
+    # Each step is best effort: a failure here only means the first page view pays for it
+    steps = (
+        load_zone_index,
+        # Only the process that will read Sheets for the host needs a client up front
+        lambda: sharedcache.acquire(sharedcache.REFRESHER) and get_worksheet(),
+        lambda: get_index().sync(),
+        lambda: [fuzzy.get_fuzzy_index(name).update() for name in local_worksheets()],
+        start_worker,
+        lambda: sharedcache.start_refresher(shards.refresh),
+        health.start,
+        metrics.start_exporter,
+    )
+    for step in steps:
+        try:
+            step()
+        except Exception:
+            pass
+
+
+def start():
+    """Prime the zone index, Sheets client and duplicate index in the background, once per process"""
+    global _started
+    with _lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
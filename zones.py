@@ -0,0 +1,83 @@
+import os
+import csv
+import hashlib
+import threading
+
+
+ZONES_PATH = "zone - Original.csv"
+
+
+class ZoneIndex:
+    """Immutable Zone -> Region -> Division hierarchy with precomputed option tuples.
+
+    Options keep the order in which they first appear in the CSV.
+    """
+
+    def __init__(self, rows):
+        hierarchy = {}
+        for zone, region, division in rows:
+            divisions = hierarchy.setdefault(zone, {}).setdefault(region, [])
+            if division not in divisions:
+                divisions.append(division)
+
+        self.zones = tuple(hierarchy)
+        self._regions = {zone: tuple(regions) for zone, regions in hierarchy.items()}
+        self._divisions = {
+            (zone, region): tuple(divisions)
+            for zone, regions in hierarchy.items()
+            for region, divisions in regions.items()
+        }
+        self.triples = frozenset(
+            (zone, region, division)
+            for (zone, region), divisions in self._divisions.items()
+            for division in divisions
+        )
+
+    def regions(self, zone):
+        """Regions of a zone, empty if the zone is unknown"""
+        return self._regions.get(zone, ())
+
+    def divisions(self, zone, region):
+        """Divisions of a region within a zone, empty if the pair is unknown"""
+        return self._divisions.get((zone, region), ())
+
+    def contains(self, zone, region, division):
+        """Whether (zone, region, division) is a valid combination"""
+        return (zone, region, division) in self.triples
+
+    def __len__(self):
+        return len(self.triples)
+
+
+def _read_rows(data):
+    reader = csv.DictReader(data.decode("utf-8-sig").splitlines())
+    reader.fieldnames = [name.strip() for name in reader.fieldnames or []]
+    for row in reader:
+        zone, region, division = row.get("ZONE"), row.get("REGION"), row.get("DIVISION")
+        if zone and region and division:
+            yield zone, region, division
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def load_zone_index(path=ZONES_PATH):
+    """Return the process-shared ZoneIndex for the CSV, rebuilding it only when the file changes"""
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == signature:
+            return cached[2]
+
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        # A touched but unchanged file keeps the existing index
+        if cached and cached[1] == digest:
+            index = cached[2]
+        else:
+            index = ZoneIndex(_read_rows(data))
+        _cache[path] = (signature, digest, index)
+        return index